@@ -21,6 +21,16 @@ rows_of_interest = [
     "sample_longitude",
 ]
 
+# Placeholder dates used by the source studies when only the year is known
+approximate_dates = frozenset(("2010-01-01", "2013-01-01", "2014-01-01"))
+
+# Every metadata CSV has the same columns, in the order out_cols is built in
+fieldnames = rows_of_interest + [
+    "is_approximate_date",
+    "is_public_dataset",
+    "input_type",
+]
+
 s3_client = boto3.client(
     "s3",
     endpoint_url="https://s3.climb.ac.uk",
@@ -37,16 +47,30 @@ with open(sys.argv[1]) as manifest_fh:
 
         out_cols = {x: row[x] for x in rows_of_interest}
 
-        if row["collection_date"] in ["2010-01-01", "2013-01-01", "2014-01-01"]:
+        name = f"mscape.{row['sample_id']}.{row['run_id']}"
+
+        collection_date = row["collection_date"]
+
+        if collection_date in approximate_dates:
             out_cols["is_approximate_date"] = "Y"
         else:
             out_cols["is_approximate_date"] = "N"
 
         out_cols["is_public_dataset"] = "Y"
 
-        out_cols["collection_date"] = datetime.datetime.strptime(
-            row["collection_date"], "%Y-%m-%d"
-        ).strftime("%Y-%m")
+        # YYYY-MM-DD dates are checked with the much cheaper date.fromisoformat (which raises on an invalid month
+        # or day just like strptime) and then truncated, any other shape still goes through strptime
+        if (
+            len(collection_date) == 10
+            and collection_date[4] == "-"
+            and collection_date[7] == "-"
+        ):
+            datetime.date.fromisoformat(collection_date)
+            out_cols["collection_date"] = collection_date[:7]
+        else:
+            out_cols["collection_date"] = datetime.datetime.strptime(
+                collection_date, "%Y-%m-%d"
+            ).strftime("%Y-%m")
 
         out_cols["input_type"] = "sample"
 
@@ -56,10 +80,9 @@ with open(sys.argv[1]) as manifest_fh:
         out_cols["sample_type"] = "other"
 
         if row["sequencing_protocol"] == "ILLUMINA":
-            with open(f"mscape.{row['sample_id']}.{row['run_id']}.csv", "wt") as csv_fh:
-                writer = csv.DictWriter(csv_fh, fieldnames=out_cols.keys())
-                writer.writeheader()
-                writer.writerow(out_cols)
+            with open(f"{name}.csv", "wt") as csv_fh:
+                writer = csv.writer(csv_fh)
+                writer.writerows((fieldnames, [out_cols[x] for x in fieldnames]))
 
             ftp_split = row["submitted_ftp"].split(";")
 
@@ -104,12 +127,9 @@ with open(sys.argv[1]) as manifest_fh:
             # )
 
         elif row["sequencing_protocol"] == "OXFORD NANOPORE":
-            with open(
-                f"mscape.{row['sample_id']}.{row['run_id']}.ont.csv", "wt"
-            ) as csv_fh:
-                writer = csv.DictWriter(csv_fh, fieldnames=out_cols.keys())
-                writer.writeheader()
-                writer.writerow(out_cols)
+            with open(f"{name}.ont.csv", "wt") as csv_fh:
+                writer = csv.writer(csv_fh)
+                writer.writerows((fieldnames, [out_cols[x] for x in fieldnames]))
 
             # local_path, response = urllib.request.urlretrieve(
             #     f"ftp://{row['submitted_ftp']}",
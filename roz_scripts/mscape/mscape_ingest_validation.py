@@ -3,62 +3,320 @@
 import csv
 import os
 from pathlib import Path
-import json
-import copy
+import orjson
+import functools
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 import time
 import logging
 import argparse
 import multiprocessing as mp
+import queue
+import threading
 from collections import namedtuple
 import sys
+import tarfile
 from itertools import batched
+from concurrent.futures import Future, ThreadPoolExecutor
 from math import log, floor
 
 from roz_scripts.utils.utils import (
     pipeline,
     init_logger,
-    get_s3_credentials,
+    get_s3_client,
+    ensure_buckets_reachable,
     csv_create,
     onyx_update,
     ensure_file_unseen,
+    ensure_files_unseen,
     onyx_reconcile,
     put_result_json,
     put_linkage_json,
     s3_to_fh,
+    load_json_file,
+    upload_files,
+    upload_local_file,
+    get_transfer_config,
+    add_ingest_error,
     EtagMismatchError,
+    upload_stream,
 )
 from varys import Varys
 
+_pipeline_env = namedtuple(
+    "_pipeline_env",
+    [
+        "k2_db_path",
+        "taxonomy_path",
+        "classifier_db",
+        "classifier_db_date",
+        "ncbi_taxonomy_date",
+        "aws_access_key_id",
+        "aws_secret_access_key",
+    ],
+)
+
+
+@functools.lru_cache(maxsize=1)
+def get_pipeline_env() -> _pipeline_env:
+    """Read the environment variables the validation pipeline needs, these don't change for the
+    lifetime of the process so they are only read once
+
+    Returns:
+        namedtuple: Named tuple containing the dated k2 database path, dated taxonomy path, classifier database name / date, taxonomy date and the AWS access / secret keys
+    """
+
+    # Consider making this a little more versatile in future
+    classifier_db = next(
+        x for x in reversed(os.getenv("SCYLLA_K2_DB_PATH").split("/")) if x != ""
+    )
+
+    return _pipeline_env(
+        k2_db_path=os.path.join(
+            os.getenv("SCYLLA_K2_DB_PATH"), os.getenv("SCYLLA_K2_DB_DATE")
+        ),
+        taxonomy_path=os.path.join(
+            os.getenv("SCYLLA_TAXONOMY_PATH"), os.getenv("SCYLLA_TAXONOMY_DATE")
+        ),
+        classifier_db=classifier_db,
+        classifier_db_date=os.getenv("SCYLLA_K2_DB_DATE"),
+        ncbi_taxonomy_date=os.getenv("SCYLLA_TAXONOMY_DATE"),
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+    )
+
+
+_IO_THREADS_PER_WORKER = 2
+
+
+def _worker_loop(
+    job_queue: mp.Queue,
+    result_queue: mp.Queue,
+    args: argparse.Namespace,
+    ingest_pipe: pipeline,
+    worker_cpus: list = None,
+) -> None:
+    """Entry point for a persistent validation worker process, pulls jobs from the job queue
+    until a None sentinel is received and pushes each result back onto the result queue
+
+    Args:
+        job_queue (mp.Queue): Queue of Varys messages to validate
+        result_queue (mp.Queue): Queue of (completed, result) tuples, where result is either the validation result tuple or the exception string
+        args (argparse.Namespace): Command line arguments object, fixed for the lifetime of the worker
+        ingest_pipe (pipeline): This worker's own instance of the ingest pipeline (see pipeline class)
+        worker_cpus (list, optional): CPUs to run this worker on when the consumer is pinned (see --pin_consumer). Defaults to None (leave the inherited affinity alone).
+    """
+
+    if worker_cpus:
+        # The fork inherits the consumer's pinning and SCHED_BATCH, undo both here before this worker starts any
+        # threads, as affinity and policy only apply to the calling thread and are copied to the threads it creates
+        os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        os.sched_setaffinity(0, worker_cpus)
+
+    # Build this worker's S3 client up front so the first job doesn't pay for it
+    get_s3_client()
+
+    log = logging.getLogger(f"{args.project}.ingest")
+
+    # Uploads run on this I/O pool so the worker can start the next pipeline run, the semaphore stops it
+    # taking on more jobs than the pool can publish
+    io_executor = ThreadPoolExecutor(max_workers=_IO_THREADS_PER_WORKER)
+    io_slots = threading.BoundedSemaphore(_IO_THREADS_PER_WORKER)
+
+    def _put_result(publish_future: Future) -> None:
+        try:
+            result_queue.put((True, publish_future.result()))
+
+        except Exception as publish_exception:
+            result_queue.put((False, str(publish_exception)))
+
+        finally:
+            io_slots.release()
+
+    while True:
+        io_slots.acquire()
+
+        message = job_queue.get()
+
+        if message is None:
+            break
+
+        try:
+            validate_result, publish_kwargs = create_validated_artifact(
+                message=message,
+                args=args,
+                ingest_pipe=ingest_pipe,
+                log=log,
+            )
+
+            # The remaining work is all S3 / Onyx I/O so hand it off, freeing this worker to start the next pipeline run
+            if publish_kwargs is not None:
+                io_executor.submit(
+                    publish_validated_artifact, **publish_kwargs
+                ).add_done_callback(_put_result)
+                continue
+
+            result_queue.put((True, validate_result))
+
+        except Exception as worker_exception:
+            result_queue.put((False, str(worker_exception)))
+
+        io_slots.release()
+
+    # Let any in-flight uploads finish and report back before the worker exits
+    io_executor.shutdown(wait=True)
+
 
 class worker_pool_handler:
-    def __init__(self, workers, logger, varys_client, project):
+    def __init__(
+        self,
+        workers,
+        logger,
+        varys_client,
+        project,
+        args,
+        ingest_pipe,
+        retry_delay=180,
+        worker_cpus=None,
+    ):
         self._log = logger
-        self.worker_pool = mp.Pool(processes=workers)
         self._varys_client = varys_client
+        self._retry_delay = retry_delay
+
+        # Caps the jobs handed to the workers (one pipeline run plus the publishes each worker can hold), anything
+        # beyond that stays unacked with Varys so the prefetch window throttles the broker
+        self._inflight = threading.BoundedSemaphore(
+            workers * (1 + _IO_THREADS_PER_WORKER)
+        )
+
+        # The workers rely on inheriting the parent's state at fork (args, ingest_pipe and any clients), so don't
+        # leave the start method to the platform default
+        mp_context = mp.get_context("fork")
+
+        self._job_queue = mp_context.Queue()
+        self._result_queue = mp_context.Queue()
+
+        self._workers = [
+            mp_context.Process(
+                target=_worker_loop,
+                # Each worker gets its own copy of these at fork so they aren't pickled with every job
+                args=(
+                    self._job_queue,
+                    self._result_queue,
+                    args,
+                    ingest_pipe,
+                    worker_cpus,
+                ),
+                daemon=True,
+            )
+            for _ in range(workers)
+        ]
+
+        for worker in self._workers:
+            worker.start()
+
+        # Results are published from a separate thread so slow S3 / AMQP calls don't hold up result handling
+        self._send_queue = queue.Queue()
+        self._sender = threading.Thread(target=self._send_results, daemon=True)
+        self._sender.start()
+
+        self._result_handler = threading.Thread(
+            target=self._handle_results, daemon=True
+        )
+        self._result_handler.start()
 
         self._log.info(f"Successfully initialised worker pool with {workers} workers")
 
         self._retry_log = {}
 
         self._project = project
+        self._announce_exchange = f"{project}-restricted-announce"
+        self._new_artifact_exchange = f"inbound-new_artifact-{project}"
+        self._hcid_exchange = f"{project}-restricted-hcid"
 
-    def submit_job(self, message, args, ingest_pipe):
-        self._log.info(
-            f"Submitting job to the worker pool for UUID: {json.loads(message.body)['uuid']}"
-        )
+        # Results go to a per project/site exchange, so the names are built the first time each pair is seen
+        self._results_exchanges = {}
 
-        self._retry_log.setdefault(json.loads(message.body)["uuid"], 0)
+    def _results_exchange(self, payload):
+        key = (payload["project"], payload["site"])
 
-        self._retry_log[json.loads(message.body)["uuid"]] += 1
+        exchange = self._results_exchanges.get(key)
 
-        self.worker_pool.apply_async(
-            func=validate,
-            kwds={"message": message, "args": args, "ingest_pipe": ingest_pipe},
-            callback=self.callback,
-            error_callback=self.error_callback,
-        )
+        if exchange is None:
+            exchange = self._results_exchanges[key] = "inbound-results-{}-{}".format(
+                *key
+            )
+
+        return exchange
+
+    def submit_job(self, message):
+        uuid = orjson.loads(message.body)["uuid"]
+
+        self._log.info(f"Submitting job to the worker pool for UUID: {uuid}")
+
+        self._retry_log.setdefault(uuid, 0)
+
+        self._retry_log[uuid] += 1
+
+        self._inflight.acquire()
+
+        self._job_queue.put(message)
+
+    def submit_job_batch(self, messages):
+        for message in messages:
+            self.submit_job(message=message)
+
+    def _handle_results(self):
+        while True:
+            result = self._result_queue.get()
+
+            if result is None:
+                break
+
+            completed, validate_result = result
+
+            try:
+                if completed:
+                    self.callback(validate_result)
+                else:
+                    self.error_callback(validate_result)
+
+            finally:
+                self._inflight.release()
+
+    def _send_results(self):
+        while True:
+            item = self._send_queue.get()
+
+            if item is None:
+                self._send_queue.task_done()
+                break
+
+            kind, message, exchange, queue_suffix = item
+
+            try:
+                if kind == "send":
+                    self._varys_client.send(
+                        message=message, exchange=exchange, queue_suffix=queue_suffix
+                    )
+
+                elif kind == "result_json":
+                    put_result_json(message, self._log)
+
+                elif kind == "linkage_json":
+                    put_linkage_json(payload=message, log=self._log)
+
+            except Exception as send_exception:
+                self._log.error(
+                    f"Failed to publish {kind} result due to error: {send_exception}"
+                )
+
+            finally:
+                self._send_queue.task_done()
+
+    def _publish(self, kind, message, exchange=None, queue_suffix=None):
+        self._send_queue.put((kind, message, exchange, queue_suffix))
 
     def callback(self, validate_result):
         success, alert, hcid_alerts, payload, message = validate_result
@@ -67,9 +325,10 @@ class worker_pool_handler:
             self._log.error(
                 f"Alert flag set for UUID: {payload['uuid']}, manual intervention required"
             )
-            self._varys_client.send(
+            self._publish(
+                "send",
                 message=payload,
-                exchange=f"{self._project}-restricted-announce",
+                exchange=self._announce_exchange,
                 queue_suffix="alert",
             )
 
@@ -80,13 +339,14 @@ class worker_pool_handler:
 
             self._varys_client.acknowledge_message(message)
 
-            self._varys_client.send(
+            self._publish(
+                "send",
                 message=payload,
-                exchange=f"inbound-results-{payload['project']}-{payload['site']}",
+                exchange=self._results_exchange(payload),
                 queue_suffix="validator",
             )
 
-            put_result_json(payload, self._log)
+            self._publish("result_json", payload)
 
             if not payload["test_flag"]:
                 new_artifact_payload = {
@@ -106,19 +366,21 @@ class worker_pool_handler:
                         "anonymised_biosample_source_id"
                     ]
 
-                put_linkage_json(payload=payload, log=self._log)
+                self._publish("linkage_json", payload)
 
-                self._varys_client.send(
+                self._publish(
+                    "send",
                     message=new_artifact_payload,
-                    exchange=f"inbound-new_artifact-{payload['project']}",
+                    exchange=self._new_artifact_exchange,
                     queue_suffix="validator",
                 )
 
                 for alert in hcid_alerts:
                     alert["climb_id"] = payload["climb_id"]
-                    self._varys_client.send(
+                    self._publish(
+                        "send",
                         message=alert,
-                        exchange=f"{payload['project']}-restricted-hcid",
+                        exchange=self._hcid_exchange,
                         queue_suffix="alert",
                     )
 
@@ -132,28 +394,33 @@ class worker_pool_handler:
                     self._log.error(
                         f"Message for UUID: {payload['uuid']} failed after {self._retry_log[payload['uuid']]} attempts, sending to dead letter queue"
                     )
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"Validation failed for UUID: {payload['uuid']} unrecoverably"
+                    add_ingest_error(
+                        payload,
+                        f"Validation failed for UUID: {payload['uuid']} unrecoverably",
                     )
 
-                    self._varys_client.send(
+                    self._publish(
+                        "send",
                         message=payload,
-                        exchange=f"{self._project}-restricted-announce",
+                        exchange=self._announce_exchange,
                         queue_suffix="dead_letter",
                     )
 
-                    self._varys_client.send(
+                    self._publish(
+                        "send",
                         message=payload,
-                        exchange=f"inbound-results-{payload['project']}-{payload['site']}",
+                        exchange=self._results_exchange(payload),
                         queue_suffix="validator",
                     )
 
-                    put_result_json(payload, self._log)
+                    self._publish("result_json", payload)
 
                     self._varys_client.nack_message(message)
 
-                    os.remove("/tmp/healthy")
+                    # Make sure the dead letter has gone out before shutting down
+                    self._send_queue.join()
+
+                    os.remove(HEALTH_FILE)
 
                     raise ValueError(
                         "Validation failed after 5 attempts, shutting down worker pool"
@@ -161,34 +428,69 @@ class worker_pool_handler:
 
                 else:
                     self._log.info(
-                        f"Rerun flag for UUID: {payload['uuid']} is set, re-queueing message"
+                        f"Rerun flag for UUID: {payload['uuid']} is set, re-queueing message in {self._retry_delay} seconds"
                     )
-                    self._varys_client.nack_message(message)
+                    # Hold the message back on a timer rather than sleeping in the worker so the worker is free
+                    # for other jobs in the meantime, the delivery stays unacked so it can't be lost
+                    retry_timer = threading.Timer(
+                        self._retry_delay,
+                        self._varys_client.nack_message,
+                        args=(message,),
+                    )
+                    retry_timer.daemon = True
+                    retry_timer.start()
 
             else:
                 self._varys_client.acknowledge_message(message)
 
-                self._varys_client.send(
+                self._publish(
+                    "send",
                     message=payload,
-                    exchange=f"inbound-results-{payload['project']}-{payload['site']}",
+                    exchange=self._results_exchange(payload),
                     queue_suffix="validator",
                 )
 
-                put_result_json(payload, self._log)
+                self._publish("result_json", payload)
 
     def error_callback(self, exception):
         self._log.error(f"Worker failed with unhandled exception: {exception}")
-        self._varys_client.send(
+        self._publish(
+            "send",
             message=f"{self._project} ingest worker failed with unhandled exception: {exception}",
-            exchange=f"{self._project}-restricted-announce",
+            exchange=self._announce_exchange,
             queue_suffix="dead_worker",
         )
-        os.remove("/tmp/healthy")
+        self._send_queue.join()
+        os.remove(HEALTH_FILE)
         sys.exit(1)
 
-    def close(self):
-        self.worker_pool.close()
-        self.worker_pool.join()
+    def close(self, timeout=None):
+        for _ in self._workers:
+            self._job_queue.put(None)
+
+        # Workers still mid-job after the timeout are stopped, their messages are unacked so they get redelivered
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        for worker in self._workers:
+            worker.join(
+                None if deadline is None else max(0, deadline - time.monotonic())
+            )
+
+            if worker.is_alive():
+                self._log.info(
+                    f"Worker {worker.pid} did not finish within the shutdown timeout, terminating"
+                )
+                worker.terminate()
+                worker.join()
+
+        # A terminated worker can leave the result queue's write lock held, so don't wait on the handler forever
+        self._result_queue.put(None)
+        self._result_handler.join(
+            None if deadline is None else max(1, deadline - time.monotonic())
+        )
+
+        self._send_queue.put(None)
+        self._sender.join()
 
 
 def execute_validation_pipeline(
@@ -196,26 +498,21 @@ def execute_validation_pipeline(
     args: argparse.Namespace,
     ingest_pipe: pipeline,
     spike_in: str,
+    log: logging.Logger,
 ) -> tuple[int, str, str]:
     """Execute the validation pipeline for a given artifact
 
     Args:
         payload (dict): The payload dict for the current artifact
         args (argparse.Namespace): The command line arguments object
-        log (logging.getLogger): The logger object
+        log (logging.Logger): The logger object
         ingest_pipe (pipeline): The instance of the ingest pipeline (see pipeline class)
 
     Returns:
         tuple[int, str, str]: Tuple containing the return code, stdout and stderr of the pipeline
     """
 
-    k2_db_path = os.path.join(
-        os.getenv("SCYLLA_K2_DB_PATH"), os.getenv("SCYLLA_K2_DB_DATE")
-    )
-
-    taxonomy_path = os.path.join(
-        os.getenv("SCYLLA_TAXONOMY_PATH"), os.getenv("SCYLLA_TAXONOMY_DATE")
-    )
+    pipeline_env = get_pipeline_env()
 
     parameters = {
         "outdir": args.result_dir,
@@ -224,8 +521,8 @@ def execute_validation_pipeline(
         "max_human_reads_before_rejection": "10000",
         "k2_host": args.k2_host,  # Parameterise this and deal with DNS stuff
         "k2_port": "8080",
-        "database": k2_db_path,
-        "taxonomy": taxonomy_path,
+        "database": pipeline_env.k2_db_path,
+        "taxonomy": pipeline_env.taxonomy_path,
     }
 
     if spike_in and spike_in != "none":
@@ -233,28 +530,35 @@ def execute_validation_pipeline(
 
     if payload["platform"] in ("ont", "illumina.se"):
         parameters["fastq"] = payload["files"][".fastq.gz"]["uri"]
-        timeout = dynamic_timeout(payload["files"][".fastq.gz"]["uri"])
+        timeout, content_lengths = dynamic_timeout(
+            payload["files"][".fastq.gz"]["uri"], log=log
+        )
 
     elif payload["platform"] == "illumina":
         parameters["fastq1"] = payload["files"][".1.fastq.gz"]["uri"]
         parameters["fastq2"] = payload["files"][".2.fastq.gz"]["uri"]
         parameters["paired"] = ""
-        timeout = dynamic_timeout(
+        timeout, content_lengths = dynamic_timeout(
             payload["files"][".1.fastq.gz"]["uri"],
             payload["files"][".2.fastq.gz"]["uri"],
+            log=log,
         )
 
+    # Keep the input sizes from the HEAD requests so the uploads can be sized without stat-ing again
+    for file_info in payload["files"].values():
+        if file_info["uri"] in content_lengths:
+            file_info["content_length"] = content_lengths[file_info["uri"]]
+
     if payload["platform"].startswith("illumina"):
         parameters["read_type"] = "illumina"
 
     log_path = Path(args.result_dir, payload["uuid"])
 
-    if not os.path.exists(log_path):
-        os.makedirs(log_path)
+    os.makedirs(log_path, exist_ok=True)
 
     env_vars = {
-        "AWS_ACCESS_KEY_ID": os.getenv("AWS_ACCESS_KEY_ID"),
-        "AWS_SECRET_ACCESS_KEY": os.getenv("AWS_SECRET_ACCESS_KEY"),
+        "AWS_ACCESS_KEY_ID": pipeline_env.aws_access_key_id,
+        "AWS_SECRET_ACCESS_KEY": pipeline_env.aws_secret_access_key,
         "NXF_WORK": "/shared/team/nxf_work/roz/work/",
         "NXF_HOME": f"/shared/team/nxf_work/roz/nextflow.worker.{os.getpid()}/",
     }
@@ -275,14 +579,14 @@ def execute_validation_pipeline(
 
 
 def handle_spike_ins(
-    payload: dict, result_path: str, log: logging.getLogger, spike_in: str
+    payload: dict, result_path: str, log: logging.Logger, spike_in: str
 ) -> tuple[bool, bool, dict]:
     """Function to add spike-in information to an existing Onyx record from the Scylla spike_in_summary.json file
 
     Args:
         payload (dict): Dict containing the payload for the current artifact
         result_path (str): Path to the results directory
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
         spike_in (str): Spike-in code for the current artifact
 
     Returns:
@@ -298,117 +602,148 @@ def handle_spike_ins(
     try:
         spike_counts_path = os.path.join(result_path, "qc", "spike_count_summary.json")
 
-        with open(spike_counts_path, "rt") as spike_in_fh:
-            spike_in_counts = json.load(spike_in_fh)
-
-            spike_in_results = spike_in_counts[spike_in]
-
-            spike_in_info = []
-
-            for reference, info in spike_in_results.items():
-                spike_in_info.append(
-                    {
-                        "taxon_id": info["taxid"],
-                        "human_readable": info["human_readable"],
-                        "reference_header": reference,
-                        "mapped_count": info["mapped_count"],
-                    }
-                )
-
-            update_fail, update_alert, payload = onyx_update(
-                payload=payload, fields={"spike_in_info": spike_in_info}, log=log
-            )
-
-            if update_fail:
-                spike_in_fail = True
-
-            if update_alert:
-                alert = True
+        spike_in_counts = load_json_file(spike_counts_path)
 
         spike_summary_path = os.path.join(result_path, "qc", "spike_summary.json")
 
-        with open(spike_summary_path, "rt") as spike_summary_fh:
-            spike_summary = json.load(spike_summary_fh)
+        spike_summary = load_json_file(spike_summary_path)
 
-            result = spike_summary[spike_in]
+    except FileNotFoundError:
+        log.error("A spike in summary file was not found")
+        add_ingest_error(payload, "No spike-in summary file, this should never happen")
+        spike_in_fail = True
+        alert = True
+        return (spike_in_fail, alert, payload)
 
-            update_fail, update_alert, payload = onyx_update(
-                payload=payload, fields={"spike_in_result": result}, log=log
-            )
+    spike_in_info = []
 
-            if update_fail:
-                spike_in_fail = True
+    for reference, info in spike_in_counts[spike_in].items():
+        spike_in_info.append(
+            {
+                "taxon_id": info["taxid"],
+                "human_readable": info["human_readable"],
+                "reference_header": reference,
+                "mapped_count": info["mapped_count"],
+            }
+        )
 
-            if update_alert:
-                alert = True
+    update_fail, update_alert, payload = onyx_update(
+        payload=payload,
+        fields={
+            "spike_in_info": spike_in_info,
+            "spike_in_result": spike_summary[spike_in],
+        },
+        log=log,
+    )
 
-    except FileNotFoundError:
-        log.error("A spike in summary file was not found")
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "No spike-in summary file, this should never happen"
-        )
+    if update_fail:
         spike_in_fail = True
+
+    if update_alert:
         alert = True
-        return (spike_in_fail, alert, payload)
 
     return (spike_in_fail, alert, payload)
 
 
-def dynamic_timeout(*s3_uris: str) -> int:
+# Timeouts from 3500 * log(x) - 20000 (floored at 1800) where x is the file size in MB, precomputed for
+# each power of two so the timeout can be looked up from the bit length of the size. Each entry uses the
+# upper bound of its size band so the lookup never gives a shorter timeout than the formula would
+_TIMEOUT_TABLE = tuple(max(1800, floor(3500 * log(2**k)) - 20000) for k in range(64))
+
+
+def dynamic_timeout(*s3_uris: str, log: logging.Logger) -> tuple[int, dict]:
     """Function to calculate the timeout for a given S3 URI based on the file size, calculated
-    using the logarithmic function -> 3500 * log(x) - 20000 where x is the file size in bytes
+    using the logarithmic function -> 3500 * log(x) - 20000 where x is the file size in MB,
+    looked up from _TIMEOUT_TABLE by the bit length of the size
 
     Args:
         *s3_uris (str): Variable number of S3 URIs to calculate the timeout for
+        log (logging.Logger): Logger object
 
     Returns:
-        int: Timeout in seconds
+        tuple[int, dict]: Tuple containing the timeout in seconds and a dict of S3 URI -> content length in bytes (empty if the HEAD requests failed)
     """
 
-    s3_credentials = get_s3_credentials()
-
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=s3_credentials.access_key,
-        aws_secret_access_key=s3_credentials.secret_key,
-        endpoint_url=s3_credentials.endpoint,
-    )
+    s3_client = get_s3_client()
 
     try:
-        content_length = 0
-        for s3_uri in s3_uris:
-            bucket, key = s3_uri.split("/", 3)[2:]
-            obj = s3_client.head_object(Bucket=bucket, Key=key)
-            content_length += obj["ContentLength"]
+        # The HEAD requests are independent so there's no need to wait on them one at a time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            head_futures = [
+                executor.submit(
+                    s3_client.head_object,
+                    Bucket=s3_uri.split("/", 3)[2],
+                    Key=s3_uri.split("/", 3)[3],
+                )
+                for s3_uri in s3_uris
+            ]
+
+            content_lengths = {
+                s3_uri: future.result()["ContentLength"]
+                for s3_uri, future in zip(s3_uris, head_futures)
+            }
 
     except ClientError as dynamic_timeout_exception:
         log.error(
-            f"Failed to get object metadata for S3 URI: {s3_uri} due to client error: {dynamic_timeout_exception}"
+            "Failed to get object metadata for S3 URIs: %s due to client error: %s",
+            ", ".join(s3_uris),
+            dynamic_timeout_exception,
         )
 
-        return 1800
+        return (1800, {})
+
+    content_length = sum(content_lengths.values())
+
+    return (_TIMEOUT_TABLE[(content_length // 1000000).bit_length()], content_lengths)
+
+
+def batched_onyx_update(
+    payload: dict, field: str, records: list, log: logging.Logger
+) -> tuple[bool, bool, dict]:
+    """Function to add a list of nested records to an existing Onyx record in batches of 100, the batches are
+    sent one after another so that each update sees the record as left by the previous one
+
+    Args:
+        payload (dict): Dict containing the payload for the current artifact
+        field (str): Name of the nested field to update
+        records (list): List of nested record dicts to add
+        log (logging.Logger): Logger object
+
+    Returns:
+        tuple[bool, bool, dict]: Tuple containing a bool indicating whether any of the updates failed, a bool indicating whether any of the updates should alert and the updated payload dict
+    """
+    update_fail = False
+    alert = False
 
-    size = content_length / 1000000
+    for batch in batched(records, 100):
+        batch_fail, batch_alert, payload = onyx_update(
+            payload=payload, fields={field: batch}, log=log
+        )
 
-    timeout = floor(3500 * log(size)) - 20000
+        if batch_fail:
+            update_fail = True
 
-    if timeout < 1800:
-        timeout = 1800
+        if batch_alert:
+            alert = True
 
-    return timeout
+    return (update_fail, alert, payload)
 
 
 def add_taxon_records(
-    payload: dict, result_path: str, log: logging.getLogger, s3_client: boto3.client
+    payload: dict,
+    result_path: str,
+    log: logging.Logger,
+    s3_client: boto3.client,
+    transfer_config: TransferConfig = None,
 ) -> tuple[bool, dict]:
     """Function to add nested taxon records to an existing Onyx record from a Scylla reads_summary.json file
 
     Args:
         payload (dict): Dict containing the payload for the current artifact
         result_path (str): Result path for the current artifact
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
         s3_client (boto3.client): Boto3 client object for S3
+        transfer_config (TransferConfig, optional): S3 TransferConfig for the uploads. Defaults to None (utils.DEFAULT_TRANSFER_CONFIG).
 
     Returns:
         tuple[bool, dict]: Tuple containing a bool indicating whether the upload failed and the updated payload dict
@@ -418,39 +753,51 @@ def add_taxon_records(
     binned_read_fail = False
     alert = False
 
+    s3_bucket = f"{payload['project']}-published-binned-reads"
+
+    # Uploads are collected as (path, bucket, key) alongside the (taxon dict, field) they populate
+    uploads = []
+    upload_targets = []
+
+    reads_dir = f"{result_path}/reads_by_taxa"
+
     try:
-        with open(
-            os.path.join(result_path, "reads_by_taxa/reads_summary_combined.json"), "rt"
-        ) as read_summary_fh:
-            summary = json.load(read_summary_fh)
+        summary_path = f"{reads_dir}/reads_summary_combined.json"
+
+        summary = load_json_file(summary_path)
 
     except FileNotFoundError:
         log.info(
-            f"Could not find reads_summary_combined.json, this probably means that there are insufficient binned taxa produced by scylla for UUID: {payload['uuid']}"
+            "Could not find reads_summary_combined.json, this probably means that there are insufficient binned taxa produced by scylla for UUID: %s",
+            payload["uuid"],
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "Could not find reads_summary_combined.json, this probably means that no taxa were present above binning thresholds by scylla"
+        add_ingest_error(
+            payload,
+            "Could not find reads_summary_combined.json, this probably means that no taxa were present above binning thresholds by scylla",
         )
         return (binned_read_fail, alert, payload)
 
     for taxa in summary:
         try:
+            qc = taxa["qc_metrics"]
             taxon_dict = {
                 "taxon_id": taxa["taxon_id"],
                 "human_readable": taxa["human_readable"],
-                "n_reads": taxa["qc_metrics"]["num_reads"],
-                "avg_quality": taxa["qc_metrics"]["avg_qual"],
-                "mean_len": taxa["qc_metrics"]["mean_len"],
+                "n_reads": qc["num_reads"],
+                "avg_quality": qc["avg_qual"],
+                "mean_len": qc["mean_len"],
                 "rank": taxa["tax_level"],
             }
         except KeyError as e:
             log.error(
-                f"Failed to parse reads_summary_combined.json for UUID: {payload['uuid']} with CID: {payload['climb_id']}. Error: {e}"
+                "Failed to parse reads_summary_combined.json for UUID: %s with CID: %s. Error: %s",
+                payload["uuid"],
+                payload["climb_id"],
+                e,
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                "Failed to parse taxon record, likely due to malformed reads_summary_combined.json"
+            add_ingest_error(
+                payload,
+                "Failed to parse taxon record, likely due to malformed reads_summary_combined.json",
             )
             binned_read_fail = True
             alert = True
@@ -458,170 +805,151 @@ def add_taxon_records(
 
         if payload["platform"] == "illumina":
             for i in (1, 2):
-                fastq_path = os.path.join(
-                    result_path,
-                    f"reads_by_taxa/{taxa['filenames'][i - 1]}.gz",
-                )
-
-                try:
-                    s3_bucket = f"{payload['project']}-published-binned-reads"
-                    s3_key = f"{payload['climb_id']}/{payload['climb_id']}_{taxa['taxon_id']}_{i}.fastq.gz"
-                    s3_uri = f"s3://{s3_bucket}/{s3_key}"
-
-                    s3_client.upload_file(
-                        fastq_path,
-                        s3_bucket,
-                        s3_key,
-                    )
+                fastq_path = f"{reads_dir}/{taxa['filenames'][i - 1]}.gz"
+                s3_key = f"{payload['climb_id']}/{payload['climb_id']}_{taxa['taxon_id']}_{i}.fastq.gz"
 
-                    taxon_dict[f"fastq_{i}"] = s3_uri
-
-                except Exception as add_taxon_record_exception:
-                    log.error(
-                        f"Failed to upload binned reads for taxon {taxa['taxon_id']} to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {add_taxon_record_exception}"
-                    )
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"Failed to upload binned reads for taxon: {taxa['taxon_id']} to storage bucket"
-                    )
-                    binned_read_fail = True
-                    alert = True
-                    continue
+                uploads.append((fastq_path, s3_bucket, s3_key))
+                upload_targets.append((taxon_dict, f"fastq_{i}"))
 
         elif payload["platform"] in ("ont", "illumina.se"):
-            fastq_path = os.path.join(
-                result_path, f"reads_by_taxa/{taxa['filenames'][0]}.gz"
-            )
-
-            try:
-                s3_bucket = f"{payload['project']}-published-binned-reads"
-                s3_key = f"{payload['climb_id']}/{payload['climb_id']}_{taxa['taxon_id']}.fastq.gz"
-                s3_uri = f"s3://{s3_bucket}/{s3_key}"
-
-                s3_client.upload_file(
-                    fastq_path,
-                    s3_bucket,
-                    s3_key,
-                )
+            fastq_path = f"{reads_dir}/{taxa['filenames'][0]}.gz"
+            s3_key = f"{payload['climb_id']}/{payload['climb_id']}_{taxa['taxon_id']}.fastq.gz"
 
-                taxon_dict["fastq_1"] = s3_uri
-
-            except Exception as add_taxon_record_exception:
-                log.error(
-                    f"Failed to binned reads for taxon {taxa['taxon_id']} to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {add_taxon_record_exception}"
-                )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    f"Failed to upload binned reads for taxon: {taxa['taxon_id']} to storage bucket"
-                )
-                binned_read_fail = True
-                alert = True
-                continue
+            uploads.append((fastq_path, s3_bucket, s3_key))
+            upload_targets.append((taxon_dict, "fastq_1"))
 
         else:
-            log.error(f"Unknown platform: {payload['platform']}")
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(f"Unknown platform: {payload['platform']}")
+            log.error("Unknown platform: %s", payload["platform"])
+            add_ingest_error(payload, f"Unknown platform: {payload['platform']}")
             binned_read_fail = True
             continue
 
         nested_records.append(taxon_dict)
 
-    if not binned_read_fail:
-        top_level_fail = False
-        for batch in batched(nested_records, 100):
-            update_fail, update_alert, payload = onyx_update(
-                payload=payload,
-                fields={"taxa_files": batch},
-                log=log,
+    upload_exceptions = upload_files(
+        s3_client=s3_client, uploads=uploads, transfer_config=transfer_config
+    )
+
+    for (fastq_path, s3_bucket, s3_key), (taxon_dict, field), upload_exception in zip(
+        uploads, upload_targets, upload_exceptions
+    ):
+        if upload_exception:
+            log.error(
+                "Failed to upload binned reads for taxon %s to long-term storage bucket for UUID: %s with CID: %s due to client error: %s",
+                taxon_dict["taxon_id"],
+                payload["uuid"],
+                payload["climb_id"],
+                upload_exception,
+            )
+            add_ingest_error(
+                payload,
+                f"Failed to upload binned reads for taxon: {taxon_dict['taxon_id']} to storage bucket",
             )
+            binned_read_fail = True
+            alert = True
+            continue
 
-            if update_fail:
-                top_level_fail = True
+        taxon_dict[field] = f"s3://{s3_bucket}/{s3_key}"
+
+    if not binned_read_fail:
+        top_level_fail, update_alert, payload = batched_onyx_update(
+            payload=payload, field="taxa_files", records=nested_records, log=log
+        )
 
         if top_level_fail:
             binned_read_fail = True
             alert = True
 
+        if update_alert:
+            alert = True
+
     return (binned_read_fail, alert, payload)
 
 
 def push_taxon_reports(
-    payload: dict, result_path: str, log: logging.getLogger, s3_client: boto3.client
-) -> tuple[bool, dict]:
-    """Push taxa reports to long-term storage bucket and update the Onyx record with the S3 directory URI
+    payload: dict,
+    result_path: str,
+    log: logging.Logger,
+    s3_client: boto3.client,
+    transfer_config: TransferConfig = None,
+) -> tuple[bool, bool, dict, dict]:
+    """Push taxa reports to long-term storage bucket and return the Onyx field for the S3 directory URI
 
     Args:
         payload (dict): Payload dict for the current artifact
         result_path (str): Path to the results directory
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
         s3_client (boto3.client): S3 boto3 client object
+        transfer_config (TransferConfig, optional): S3 TransferConfig for the uploads. Defaults to None (utils.DEFAULT_TRANSFER_CONFIG).
 
     Returns:
-        tuple[bool, dict]: Tuple containing a bool indicating whether the upload failed and the updated payload dict
+        tuple[bool, bool, dict, dict]: Tuple containing a bool indicating whether the upload failed, a bool indicating whether to squawk in the alert channel, a dict of Onyx fields to set and the updated payload dict
     """
 
     taxon_report_fail = False
     alert = False
+    onyx_fields = {}
 
     taxon_report_path = os.path.join(result_path, "classifications")
 
     try:
-        reports = os.listdir(taxon_report_path)
+        # Skip directories and hidden files just incase
+        with os.scandir(taxon_report_path) as report_entries:
+            reports = [
+                entry
+                for entry in report_entries
+                if not entry.is_dir(follow_symlinks=False)
+                and not entry.name.startswith(".")
+            ]
 
         s3_bucket = f"{payload['project']}-published-taxon-reports"
 
-        for report in reports:
-            # Skip directories and hidden files just incase
-            if os.path.isdir(
-                os.path.join(taxon_report_path, report)
-            ) or report.startswith("."):
-                continue
+        # Add handling for Db in name etc
+        upload_exceptions = upload_files(
+            s3_client=s3_client,
+            transfer_config=transfer_config,
+            uploads=[
+                (
+                    report.path,
+                    s3_bucket,
+                    f"{payload['climb_id']}/{payload['climb_id']}_{report.name}",
+                )
+                for report in reports
+            ],
+        )
 
-            s3_key = f"{payload['climb_id']}/{payload['climb_id']}_{report}"
-            # Add handling for Db in name etc
-            s3_client.upload_file(
-                os.path.join(taxon_report_path, report),
-                s3_bucket,
-                s3_key,
-            )
+        for upload_exception in upload_exceptions:
+            if upload_exception:
+                raise upload_exception
 
     except Exception as push_taxon_report_exception:
         log.error(
-            f"Failed to upload taxon classification to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {push_taxon_report_exception}"
+            "Failed to upload taxon classification to long-term storage bucket for UUID: %s with CID: %s due to client error: %s",
+            payload["uuid"],
+            payload["climb_id"],
+            push_taxon_report_exception,
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "Failed to upload taxon classification to storage bucket"
+        add_ingest_error(
+            payload, "Failed to upload taxon classification to storage bucket"
         )
         taxon_report_fail = True
         alert = True
 
     if not taxon_report_fail:
-        update_fail, update_alert, payload = onyx_update(
-            payload=payload,
-            fields={"taxon_reports": f"s3://{s3_bucket}/{payload['climb_id']}/"},
-            log=log,
-        )
+        onyx_fields["taxon_reports"] = f"s3://{s3_bucket}/{payload['climb_id']}/"
 
-        if update_fail:
-            taxon_report_fail = True
-
-        if update_alert:
-            alert = True
-
-    return (taxon_report_fail, alert, payload)
+    return (taxon_report_fail, alert, onyx_fields, payload)
 
 
 def add_classifier_calls(
-    payload: dict, result_path: str, log: logging.getLogger
+    payload: dict, result_path: str, log: logging.Logger
 ) -> tuple[bool, bool, dict]:
     """Add classifier calls to the Onyx record from the Scylla kraken_report.json file
 
     Args:
         payload (dict): Payload dict for the current artifact
         result_path (str): Path to the results directory
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
 
     Returns:
         tuple[bool, bool, dict]: Tuple containing a bool indicating whether the upload failed, a bool indicating whether to squawk in the alert channel and the updated payload dict
@@ -636,8 +964,8 @@ def add_classifier_calls(
             result_path, "pipeline_info", f"params_{payload['uuid']}.log"
         )
 
-        with open(pipe_params_path, "rt") as pipe_params_fh:
-            pipe_params = json.load(pipe_params_fh)
+        with open(pipe_params_path, "rb") as pipe_params_fh:
+            pipe_params = orjson.loads(pipe_params_fh.read())
 
         classifier_calls_path = os.path.join(
             result_path,
@@ -645,8 +973,7 @@ def add_classifier_calls(
             f"{pipe_params['database_set']}.kraken_report.json",
         )
 
-        with open(classifier_calls_path, "rt") as classifier_calls_fh:
-            kraken_report_dict = json.load(classifier_calls_fh)
+        kraken_report_dict = load_json_file(classifier_calls_path)
 
         for data in kraken_report_dict.values():
             data["taxon_id"] = data.pop("taxid")
@@ -657,49 +984,56 @@ def add_classifier_calls(
 
     except Exception as add_classifier_calls_exception:
         log.error(
-            f"Failed to add classifier calls for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to error: {add_classifier_calls_exception}"
+            "Failed to add classifier calls for UUID: %s with CID: %s due to error: %s",
+            payload["uuid"],
+            payload["climb_id"],
+            add_classifier_calls_exception,
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append("Failed to parse classifier calls dict")
+        add_ingest_error(payload, "Failed to parse classifier calls dict")
         classifier_calls_fail = True
         alert = True
 
     if not classifier_calls_fail:
-        top_level_fail = False
-        for batch in batched(classifier_calls, 100):
-            update_fail, update_alert, payload = onyx_update(
-                payload=payload,
-                fields={"classifier_calls": batch},
-                log=log,
-            )
-
-            if update_fail:
-                top_level_fail = True
+        top_level_fail, update_alert, payload = batched_onyx_update(
+            payload=payload,
+            field="classifier_calls",
+            records=classifier_calls,
+            log=log,
+        )
 
         if top_level_fail:
             classifier_calls_fail = True
             alert = True
 
+        if update_alert:
+            alert = True
+
     return (classifier_calls_fail, alert, payload)
 
 
 def push_report_file(
-    payload: dict, result_path: str, log: logging.getLogger, s3_client: boto3.client
-) -> tuple[bool, dict]:
-    """Push report file to long-term storage bucket and update the Onyx record with the report URI
+    payload: dict,
+    result_path: str,
+    log: logging.Logger,
+    s3_client: boto3.client,
+    transfer_config: TransferConfig = None,
+) -> tuple[bool, bool, dict, dict]:
+    """Push report file to long-term storage bucket and return the Onyx field for the report URI
 
     Args:
         payload (dict): Payload dict for the current artifact
         result_path (str): Path to the results directory
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
         s3_client (boto3.client): Boto3 client object for S3
+        transfer_config (TransferConfig, optional): S3 TransferConfig for the uploads. Defaults to None (utils.DEFAULT_TRANSFER_CONFIG).
 
     Returns:
-        tuple[bool, dict]: Tuple containing a bool indicating whether the upload failed and the updated payload dict
+        tuple[bool, bool, dict, dict]: Tuple containing a bool indicating whether the upload failed, a bool indicating whether to squawk in the alert channel, a dict of Onyx fields to set and the updated payload dict
     """
 
     report_fail = False
     alert = False
+    onyx_fields = {}
 
     report_path = os.path.join(result_path, f"{payload['uuid']}_report.html")
 
@@ -711,103 +1045,96 @@ def push_report_file(
 
     try:
         # Add handling for Db in name etc
-        s3_client.upload_file(
-            report_path,
-            s3_bucket,
-            s3_key,
+        upload_local_file(
+            s3_client=s3_client,
+            path=report_path,
+            bucket=s3_bucket,
+            key=s3_key,
+            transfer_config=transfer_config,
         )
     except (ClientError, FileNotFoundError) as push_report_file_exception:
         log.error(
-            f"Failed to upload scylla report to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {push_report_file_exception}"
-        )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "Failed to upload scylla report to storage bucket"
+            "Failed to upload scylla report to long-term storage bucket for UUID: %s with CID: %s due to client error: %s",
+            payload["uuid"],
+            payload["climb_id"],
+            push_report_file_exception,
         )
+        add_ingest_error(payload, "Failed to upload scylla report to storage bucket")
         report_fail = True
         alert = True
 
     if not report_fail:
-        update_fail, update_alert, payload = onyx_update(
-            payload=payload,
-            fields={"ingest_report": s3_uri},
-            log=log,
-        )
+        onyx_fields["ingest_report"] = s3_uri
 
-        if update_fail:
-            report_fail = True
-
-        if update_alert:
-            alert = True
-
-    return (report_fail, alert, payload)
+    return (report_fail, alert, onyx_fields, payload)
 
 
 def add_reads_record(
     payload: dict,
     s3_client: boto3.client,
     result_path: str,
-    log: logging.getLogger,
-) -> tuple[bool, dict]:
-    """Function to upload raw reads to long-term storage bucket and add the fastq_1 and fastq_2 fields to the Onyx record
+    log: logging.Logger,
+    transfer_config: TransferConfig = None,
+) -> tuple[bool, bool, dict, dict]:
+    """Function to upload raw reads to long-term storage bucket and return the fastq_1 and fastq_2 fields for the Onyx record
 
     Args:
         payload (dict): Payload dict for the record to update
         s3_client (boto3.client): Boto3 client object for S3
         result_path (str): Path to the results directory
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
+        transfer_config (TransferConfig, optional): S3 TransferConfig for the uploads. Defaults to None (utils.DEFAULT_TRANSFER_CONFIG).
 
     Returns:
-        tuple[bool, dict]: Tuple containing a bool indicating whether the upload failed and the updated payload dict
+        tuple[bool, bool, dict, dict]: Tuple containing a bool indicating whether the upload failed, a bool indicating whether to squawk in the alert channel, a dict of Onyx fields to set and the updated payload dict
     """
 
     raw_read_fail = False
     alert = False
+    onyx_fields = {}
 
     s3_bucket = f"{payload['project']}-published-reads"
 
     if payload["platform"] == "illumina":
-        for i in (1, 2):
-            fastq_path = os.path.join(
-                result_path, f"preprocess/{payload['uuid']}_{i}.fastp.fastq.gz"
-            )
-
-            try:
-                s3_key = f"{payload['climb_id']}_{i}.fastq.gz"
-
-                s3_client.upload_file(
-                    fastq_path,
+        upload_exceptions = upload_files(
+            s3_client=s3_client,
+            transfer_config=transfer_config,
+            uploads=[
+                (
+                    os.path.join(
+                        result_path, f"preprocess/{payload['uuid']}_{i}.fastp.fastq.gz"
+                    ),
                     s3_bucket,
-                    s3_key,
+                    f"{payload['climb_id']}_{i}.fastq.gz",
                 )
+                for i in (1, 2)
+            ],
+        )
 
-            except (ClientError, FileNotFoundError) as add_reads_record_exception:
-                log.error(
-                    f"Failed to upload reads to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {add_reads_record_exception}"
-                )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    "Failed to upload reads to storage bucket"
-                )
-                raw_read_fail = True
-                alert = True
+        for add_reads_record_exception in upload_exceptions:
+            if not add_reads_record_exception:
                 continue
 
-        if not raw_read_fail:
-            update_fail, update_alert, payload = onyx_update(
-                payload=payload,
-                fields={
-                    "fastq_1": f"s3://{s3_bucket}/{payload['climb_id']}_1.fastq.gz",
-                    "fastq_2": f"s3://{s3_bucket}/{payload['climb_id']}_2.fastq.gz",
-                },
-                log=log,
-            )
+            if not isinstance(
+                add_reads_record_exception, (ClientError, FileNotFoundError)
+            ):
+                raise add_reads_record_exception
 
-            if update_fail:
-                raw_read_fail = True
+            log.error(
+                "Failed to upload reads to long-term storage bucket for UUID: %s with CID: %s due to client error: %s",
+                payload["uuid"],
+                payload["climb_id"],
+                add_reads_record_exception,
+            )
+            add_ingest_error(payload, "Failed to upload reads to storage bucket")
+            raw_read_fail = True
+            alert = True
 
-            if update_alert:
-                alert = True
+        if not raw_read_fail:
+            onyx_fields = {
+                "fastq_1": f"s3://{s3_bucket}/{payload['climb_id']}_1.fastq.gz",
+                "fastq_2": f"s3://{s3_bucket}/{payload['climb_id']}_2.fastq.gz",
+            }
 
     elif payload["platform"] in ("ont", "illumina.se"):
         fastq_path = os.path.join(
@@ -817,51 +1144,48 @@ def add_reads_record(
         s3_key = f"{payload['climb_id']}.fastq.gz"
 
         try:
-            s3_client.upload_file(
-                fastq_path,
-                s3_bucket,
-                s3_key,
+            upload_local_file(
+                s3_client=s3_client,
+                path=fastq_path,
+                bucket=s3_bucket,
+                key=s3_key,
+                transfer_config=transfer_config,
             )
 
         except (ClientError, FileNotFoundError) as add_reads_record_exception:
             log.error(
-                f"Failed to upload reads to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {add_reads_record_exception}"
+                "Failed to upload reads to long-term storage bucket for UUID: %s with CID: %s due to client error: %s",
+                payload["uuid"],
+                payload["climb_id"],
+                add_reads_record_exception,
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append("Failed to upload reads to storage bucket")
+            add_ingest_error(payload, "Failed to upload reads to storage bucket")
 
             raw_read_fail = True
             alert = True
 
         if not raw_read_fail:
-            update_fail, update_alert, payload = onyx_update(
-                payload=payload,
-                fields={"fastq_1": f"s3://{s3_bucket}/{s3_key}"},
-                log=log,
-            )
-
-            if update_fail:
-                raw_read_fail = True
-
-            if update_alert:
-                alert = True
+            onyx_fields = {"fastq_1": f"s3://{s3_bucket}/{s3_key}"}
 
     else:
-        log.error(f"Unknown platform: {payload['platform']}")
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(f"Unknown platform: {payload['platform']}")
+        log.error("Unknown platform: %s", payload["platform"])
+        add_ingest_error(payload, f"Unknown platform: {payload['platform']}")
         raw_read_fail = True
         alert = True
 
-    return (raw_read_fail, alert, payload)
+    return (raw_read_fail, alert, onyx_fields, payload)
+
+
+_READ_FRACTIONS = ("human_filtered", "unclassified", "viral_and_unclassified", "viral")
 
 
 def read_fraction_upload(
     payload: dict,
     s3_client: boto3.client,
     result_path: str,
-    log: logging.getLogger,
+    log: logging.Logger,
     fraction_prefix: str,
+    transfer_config: TransferConfig = None,
 ) -> tuple[bool, bool, dict]:
     """Function to upload read fractions to long-term storage bucket and add the fastq_1 and fastq_2 fields to the Onyx record
 
@@ -869,8 +1193,9 @@ def read_fraction_upload(
         payload (dict): Payload dict for the record to update
         s3_client (boto3.client): Boto3 client object for S3
         result_path (str): Path to the results directory
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
         fraction_prefix (str): Prefix for the read fraction
+        transfer_config (TransferConfig, optional): S3 TransferConfig for the uploads. Defaults to None (utils.DEFAULT_TRANSFER_CONFIG).
 
     Returns:
         tuple[bool, bool, dict]: Tuple containing a bool indicating whether the upload failed, a bool indicating whether to squawk in the alert channel and the updated payload dict
@@ -881,52 +1206,75 @@ def read_fraction_upload(
 
     s3_bucket = f"{payload['project']}-published-read-fractions"
 
+    read_fractions_dir = f"{result_path}/read_fractions"
+
     if payload["platform"] == "illumina":
-        for i in (1, 2):
-            fastq_path = os.path.join(
-                result_path,
-                "read_fractions",
-                f"{fraction_prefix}_{i}.fastq.gz",
+        present_fractions = {
+            f"{fraction_prefix}_reads_{i}": (
+                f"{read_fractions_dir}/{fraction_prefix}_{i}.fastq.gz",
+                f"{payload['climb_id']}/{payload['climb_id']}.{fraction_prefix}_{i}.fastq.gz",
             )
+            for i in (1, 2)
+            if os.path.exists(f"{read_fractions_dir}/{fraction_prefix}_{i}.fastq.gz")
+        }
 
-            try:
-                s3_key = f"{payload['climb_id']}/{payload['climb_id']}.{fraction_prefix}_{i}.fastq.gz"
+        if not present_fractions:
+            log.info(
+                "Could not find read fraction files, probably because no reads were present in the fraction"
+            )
+            add_ingest_error(
+                payload,
+                f"Could not find read fraction file: {fraction_prefix}, probably because no reads were present in the fraction",
+            )
+            # This doesn't mean anything has actually failed, just that there were no reads in the fraction
+            return (read_fraction_fail, alert, payload)
 
-                s3_client.upload_file(
-                    fastq_path,
-                    s3_bucket,
-                    s3_key,
-                )
+        if len(present_fractions) == 1:
+            log.info(
+                "Could not find one of the read fraction files, probably because no reads were present in the fraction"
+            )
+            add_ingest_error(
+                payload,
+                f"Could not find read fraction file: {fraction_prefix}, probably because no reads were present in the fraction",
+            )
 
-            except ClientError as add_read_fraction_exception:
-                log.error(
-                    f"Failed to upload reads to long-term storage bucket for UUID: {payload['uuid']} with CLIMB-ID: {payload['climb_id']} due to client error: {add_read_fraction_exception}"
-                )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    f"Failed to upload read fraction: {fraction_prefix} to storage bucket"
-                )
-                read_fraction_fail = True
-                alert = True
-                continue
+        upload_exceptions = upload_files(
+            s3_client=s3_client,
+            transfer_config=transfer_config,
+            uploads=[
+                (fastq_path, s3_bucket, s3_key)
+                for fastq_path, s3_key in present_fractions.values()
+            ],
+        )
 
-            except FileNotFoundError:
-                log.info(
-                    "Could not find read fraction file, probably because no reads were present in the fraction"
-                )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    f"Could not find read fraction file: {fraction_prefix}, probably because no reads were present in the fraction"
-                )
-                # This doesn't mean anything has actually failed, just that there were no reads in the fraction
+        for add_read_fraction_exception in upload_exceptions:
+            if not add_read_fraction_exception:
                 continue
 
+            if not isinstance(
+                add_read_fraction_exception, (ClientError, FileNotFoundError)
+            ):
+                raise add_read_fraction_exception
+
+            log.error(
+                "Failed to upload reads to long-term storage bucket for UUID: %s with CLIMB-ID: %s due to client error: %s",
+                payload["uuid"],
+                payload["climb_id"],
+                add_read_fraction_exception,
+            )
+            add_ingest_error(
+                payload,
+                f"Failed to upload read fraction: {fraction_prefix} to storage bucket",
+            )
+            read_fraction_fail = True
+            alert = True
+
         if not read_fraction_fail:
             update_fail, update_alert, payload = onyx_update(
                 payload=payload,
                 fields={
-                    f"{fraction_prefix}_reads_1": f"s3://{s3_bucket}/{payload['climb_id']}/{payload['climb_id']}.{fraction_prefix}_1.fastq.gz",
-                    f"{fraction_prefix}_reads_2": f"s3://{s3_bucket}/{payload['climb_id']}/{payload['climb_id']}.{fraction_prefix}_2.fastq.gz",
+                    field: f"s3://{s3_bucket}/{s3_key}"
+                    for field, (_, s3_key) in present_fractions.items()
                 },
                 log=log,
             )
@@ -938,30 +1286,31 @@ def read_fraction_upload(
                 alert = True
 
     elif payload["platform"] in ("ont", "illumina.se"):
-        fastq_path = os.path.join(
-            result_path,
-            "read_fractions",
-            f"{fraction_prefix}.fastq.gz",
-        )
+        fastq_path = f"{read_fractions_dir}/{fraction_prefix}.fastq.gz"
 
         s3_key = (
             f"{payload['climb_id']}/{payload['climb_id']}.{fraction_prefix}.fastq.gz"
         )
 
         try:
-            s3_client.upload_file(
-                fastq_path,
-                s3_bucket,
-                s3_key,
+            upload_local_file(
+                s3_client=s3_client,
+                path=fastq_path,
+                bucket=s3_bucket,
+                key=s3_key,
+                transfer_config=transfer_config,
             )
 
         except (ClientError, FileNotFoundError) as add_read_fraction_exception:
             log.error(
-                f"Failed to upload reads to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {add_read_fraction_exception}"
+                "Failed to upload reads to long-term storage bucket for UUID: %s with CID: %s due to client error: %s",
+                payload["uuid"],
+                payload["climb_id"],
+                add_read_fraction_exception,
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"Failed to upload read fraction: {fraction_prefix} to storage bucket"
+            add_ingest_error(
+                payload,
+                f"Failed to upload read fraction: {fraction_prefix} to storage bucket",
             )
 
             read_fraction_fail = True
@@ -981,17 +1330,202 @@ def read_fraction_upload(
                 alert = True
 
     else:
-        log.error(f"Unknown platform: {payload['platform']}")
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(f"Unknown platform: {payload['platform']}")
+        log.error("Unknown platform: %s", payload["platform"])
+        add_ingest_error(payload, f"Unknown platform: {payload['platform']}")
+        read_fraction_fail = True
+        alert = True
+
+    return (read_fraction_fail, alert, payload)
+
+
+def _write_tar_stream(write_fd: int, paths: list) -> None:
+    """Function to stream a set of local files into an uncompressed tar written to a file descriptor
+
+    Args:
+        write_fd (int): Write end of a pipe to stream the tar into
+        paths (list): List of local file paths to add to the tar
+    """
+    with os.fdopen(write_fd, "wb") as write_fh:
+        with tarfile.open(fileobj=write_fh, mode="w|") as tar_fh:
+            for path in paths:
+                tar_fh.add(path, arcname=os.path.basename(path))
+
+
+def read_fractions_tar_upload(
+    payload: dict,
+    s3_client: boto3.client,
+    result_path: str,
+    log: logging.Logger,
+    transfer_config: TransferConfig = None,
+) -> tuple[bool, bool, dict]:
+    """Function to upload all read fractions as a single tar object to the long-term storage bucket and add the read_fractions_tar field to the Onyx record,
+    if the tar cannot be written or uploaded in full the object is deleted and the Onyx record is left untouched.
+    read_fractions_tar is not one of the per-fraction fields, it has to be added to the project's Onyx schema before --tar_read_fractions is enabled
+
+    Args:
+        payload (dict): Payload dict for the record to update
+        s3_client (boto3.client): Boto3 client object for S3
+        result_path (str): Path to the results directory
+        log (logging.Logger): Logger object
+        transfer_config (TransferConfig, optional): S3 TransferConfig for the upload. Defaults to None (utils.DEFAULT_TRANSFER_CONFIG).
+
+    Returns:
+        tuple[bool, bool, dict]: Tuple containing a bool indicating whether the upload failed, a bool indicating whether to squawk in the alert channel and the updated payload dict
+    """
+
+    read_fraction_fail = False
+    alert = False
+
+    s3_bucket = f"{payload['project']}-published-read-fractions"
+    s3_key = f"{payload['climb_id']}/{payload['climb_id']}.read_fractions.tar"
+
+    try:
+        with os.scandir(f"{result_path}/read_fractions") as fraction_entries:
+            fraction_paths = sorted(
+                entry.path
+                for entry in fraction_entries
+                if entry.name.endswith(".fastq.gz")
+            )
+
+    except FileNotFoundError:
+        fraction_paths = []
+
+    if not fraction_paths:
+        log.info(
+            "Could not find any read fraction files for UUID: %s, probably because no reads were present in the fractions",
+            payload["uuid"],
+        )
+        add_ingest_error(
+            payload,
+            "Could not find any read fraction files, probably because no reads were present in the fractions",
+        )
+        return (read_fraction_fail, alert, payload)
+
+    # Stream the tar through a pipe so it is never written to local disk
+    read_fd, write_fd = os.pipe()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        writer_future = executor.submit(_write_tar_stream, write_fd, fraction_paths)
+
+        try:
+            with os.fdopen(read_fd, "rb") as read_fh:
+                upload_stream(
+                    s3_client=s3_client,
+                    fileobj=read_fh,
+                    bucket=s3_bucket,
+                    key=s3_key,
+                    transfer_config=transfer_config,
+                )
+
+        except (ClientError, OSError) as upload_exception:
+            tar_upload_exception = upload_exception
+
+        else:
+            tar_upload_exception = None
+
+    # A writer that fails part way through still closes the pipe, which the upload sees as the end of a
+    # (truncated) tar, so the object is only kept if the writer finished as well
+    if tar_upload_exception is None:
+        tar_upload_exception = writer_future.exception()
+
+    if tar_upload_exception is not None:
+        log.error(
+            "Failed to upload read fraction tar to long-term storage bucket for UUID: %s with CID: %s due to error: %s",
+            payload["uuid"],
+            payload["climb_id"],
+            tar_upload_exception,
+        )
+        add_ingest_error(
+            payload, "Failed to upload read fraction tar to storage bucket"
+        )
+
+        try:
+            s3_client.delete_object(Bucket=s3_bucket, Key=s3_key)
+
+        except ClientError as delete_exception:
+            log.error(
+                "Failed to delete partial read fraction tar s3://%s/%s for UUID: %s due to client error: %s",
+                s3_bucket,
+                s3_key,
+                payload["uuid"],
+                delete_exception,
+            )
+
         read_fraction_fail = True
         alert = True
 
+    if not read_fraction_fail:
+        update_fail, update_alert, payload = onyx_update(
+            payload=payload,
+            fields={"read_fractions_tar": f"s3://{s3_bucket}/{s3_key}"},
+            log=log,
+        )
+
+        if update_fail:
+            read_fraction_fail = True
+
+        if update_alert:
+            alert = True
+
     return (read_fraction_fail, alert, payload)
 
 
+# Known Scylla process failures keyed on (process name prefix, exit code), a None message means the
+# exit code is expected and not an error. Anything not in here is treated as an unexpected pipeline failure
+_TRACE_EXIT_ERRORS = {
+    ("paired_concatenate", "5"): (
+        "At least one FASTQ in the pair appear to not contain valid header lines, please resubmit valid FASTQ files or contact the {project} admin team if you believe this to be in error"
+    ),
+    ("paired_concatenate", "8"): (
+        "Paired FASTQ read headers do not appear to match between files, please resubmit valid FASTQ files or contact the {project} admin team if you believe this to be in error"
+    ),
+    ("extract_taxa_reads", "2"): (
+        "Human reads detected above rejection threshold, please ensure pre-upload dehumanisation has been performed properly"
+    ),
+    ("extract_taxa_paired_reads", "2"): (
+        "Human reads detected above rejection threshold, please ensure pre-upload dehumanisation has been performed properly"
+    ),
+    ("extract_taxa_reads", "3"): None,
+    ("extract_taxa_paired_reads", "3"): None,
+    ("fastp", "255"): (
+        "Submitted gzipped fastq file(s) appear to be corrupted or unreadable, please resubmit them or contact the {project} admin team for assistance"
+    ),
+    ("fastp", "10"): (
+        "No reads left after fastp filtering, either all reads fail QC or at least one FASTQ is malformed, please contact the {project} admin team if you believe this to be in error"
+    ),
+}
+
+_TRACE_EXIT_PREFIXES = tuple(dict.fromkeys(prefix for prefix, _ in _TRACE_EXIT_ERRORS))
+
+
+def _load_trace(trace_path: str) -> dict:
+    """Parse a Nextflow execution trace into a dict of process name -> (exit code, status)
+
+    Args:
+        trace_path (str): Path to the execution trace file
+
+    Returns:
+        dict: Dict of process name -> (exit code, status) tuple
+    """
+
+    with open(trace_path, newline="") as trace_fh:
+        reader = csv.reader(trace_fh, delimiter="\t")
+
+        header = next(reader)
+        name_idx, exit_idx, status_idx = (
+            header.index("name"),
+            header.index("exit"),
+            header.index("status"),
+        )
+
+        return {
+            row[name_idx].rsplit(":", 1)[-1]: (row[exit_idx], row[status_idx])
+            for row in reader
+        }
+
+
 def ret_0_parser(
-    log: logging.getLogger,
+    log: logging.Logger,
     payload: dict,
     result_path: str,
     ingest_fail: bool = False,
@@ -999,7 +1533,7 @@ def ret_0_parser(
     """Function to parse the execution trace of a Nextflow pipeline run to determine whether any of the processes failed.
 
     Args:
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
         payload (dict): Payload dictionary
         result_path (str): Path to the results directory
         ingest_fail (bool): Boolean to indicate whether the ingest has failed up to this point (default: False)
@@ -1008,102 +1542,81 @@ def ret_0_parser(
         tuple[bool, dict]: Tuple containing the ingest fail boolean and the payload dictionary
     """
     try:
-        with open(
-            os.path.join(
-                result_path,
-                "pipeline_info",
-                f"execution_trace_{payload['uuid']}.txt",
-            )
-        ) as trace_fh:
-            reader = csv.DictReader(trace_fh, delimiter="\t")
+        pipeline_info_dir = f"{result_path}/pipeline_info"
+
+        trace_path = f"{pipeline_info_dir}/execution_trace_{payload['uuid']}.txt"
 
-            trace_dict = {}
-            for process in reader:
-                trace_dict[process["name"].split(":")[-1]] = process
+        trace_dict = _load_trace(trace_path)
 
         with open(
-            os.path.join(
-                result_path,
-                "pipeline_info",
-                f"workflow_version_{payload['uuid']}.txt",
-            ),
-            "rt",
+            f"{pipeline_info_dir}/workflow_version_{payload['uuid']}.txt", "rt"
         ) as version_fh:
             version = version_fh.read().strip()
 
         payload["scylla_version"] = version
 
-        for process, trace in trace_dict.items():
-            if trace["exit"] != "0":
-                if process.startswith("paired_concatenate") and trace["exit"] == "5":
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"At least one FASTQ in the pair appear to not contain valid header lines, please resubmit valid FASTQ files or contact the {payload['project']} admin team if you believe this to be in error"
-                    )
-                    ingest_fail = True
-                elif process.startswith("paired_concatenate") and trace["exit"] == "8":
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"Paired FASTQ read headers do not appear to match between files, please resubmit valid FASTQ files or contact the {payload['project']} admin team if you believe this to be in error"
-                    )
-                    ingest_fail = True
-                elif (
-                    process.startswith("extract_taxa_reads")
-                    or process.startswith("extract_taxa_paired_reads")
-                ) and trace["exit"] == "2":
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        "Human reads detected above rejection threshold, please ensure pre-upload dehumanisation has been performed properly"
-                    )
-                    ingest_fail = True
-                elif (
-                    process.startswith("extract_taxa_reads")
-                    or process.startswith("extract_taxa_paired_reads")
-                ) and trace["exit"] == "3":
+        for process, (exit_code, status) in trace_dict.items():
+            if exit_code == "0":
+                continue
+
+            prefix = next(
+                (
+                    prefix
+                    for prefix in _TRACE_EXIT_PREFIXES
+                    if process.startswith(prefix)
+                ),
+                None,
+            )
+
+            if (prefix, exit_code) in _TRACE_EXIT_ERRORS:
+                error = _TRACE_EXIT_ERRORS[(prefix, exit_code)]
+
+                # Expected exit code, not an error
+                if error is None:
                     continue
-                elif process.startswith("fastp") and trace["exit"] == "255":
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"Submitted gzipped fastq file(s) appear to be corrupted or unreadable, please resubmit them or contact the {payload['project']} admin team for assistance"
-                    )
-                    ingest_fail = True
-                elif process.startswith("fastp") and trace["exit"] == "10":
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"No reads left after fastp filtering, either all reads fail QC or at least one FASTQ is malformed, please contact the {payload['project']} admin team if you believe this to be in error"
-                    )
-                    ingest_fail = True
-                else:
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"{payload['project']} validation pipeline (Scylla) failed in process {process} with exit code {trace['exit']} and status {trace['status']}"
-                    )
-                    ingest_fail = True
-                    payload["rerun"] = True
+
+                add_ingest_error(payload, error.format(project=payload["project"]))
+                ingest_fail = True
+
+            else:
+                add_ingest_error(
+                    payload,
+                    f"{payload['project']} validation pipeline (Scylla) failed in process {process} with exit code {exit_code} and status {status}",
+                )
+                ingest_fail = True
+                payload["rerun"] = True
 
     except Exception as pipeline_trace_exception:
         log.error(
-            f"Could not open pipeline trace for UUID: {payload['uuid']} despite NXF exit code 0 due to error: {pipeline_trace_exception}"
+            "Could not open pipeline trace for UUID: %s despite NXF exit code 0 due to error: %s",
+            payload["uuid"],
+            pipeline_trace_exception,
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append("Could not parse Scylla pipeline trace")
+        add_ingest_error(payload, "Could not parse Scylla pipeline trace")
         payload["rerun"] = True
         ingest_fail = True
-        time.sleep(args.retry_delay)
 
     return (ingest_fail, payload)
 
 
+_HCID_SUFFIXES = (".warning.json", "hcid.counts.csv")
+
+
 def handle_hcid(
-    log: logging.getLogger, payload: dict, result_path: str, s3_client: boto3.client
+    log: logging.Logger,
+    payload: dict,
+    result_path: str,
+    s3_client: boto3.client,
+    transfer_config: TransferConfig = None,
 ) -> tuple[bool, list, bool, dict]:
     """Function to handle the parsing of HCID warnings output by the Scylla pipeline
 
     Args:
-        log (logging.getLogger): Logger object
+        log (logging.Logger): Logger object
         payload (dict): Payload dictionary
         result_path (str): Path to the results directory
         s3_client (boto3.client): Boto3 client object for S3
+        transfer_config (TransferConfig, optional): S3 TransferConfig for the uploads. Defaults to None (utils.DEFAULT_TRANSFER_CONFIG).
 
     Returns:
         tuple[bool, list, bool, dict]: Tuple containing a bool indicating whether the ingest has failed, a list of HCID alerts, a bool indicating whether to squawk in the alert channel and the updated payload dictionary
@@ -1117,93 +1630,104 @@ def handle_hcid(
     s3_bucket = f"{payload['project']}-published-hcid"
 
     try:
-        hcid_path = os.path.join(result_path, "qc")
+        hcid_path = f"{result_path}/qc"
 
-        contents = os.listdir(hcid_path)
+        uploads = []
 
-        for path in contents:
+        with os.scandir(hcid_path) as hcid_entries:
+            for entry in hcid_entries:
+                if not entry.name.endswith(_HCID_SUFFIXES):
+                    continue
 
-            full_path = os.path.join(hcid_path, path)
+                if entry.name.endswith(".warning.json"):
 
-            if not path.endswith(".warning.json") and not path.endswith(
-                "hcid.counts.csv"
-            ):
-                continue
+                    with open(entry.path, "rb") as hcid_fh:
+                        hcid_message = orjson.loads(hcid_fh.read())
 
-            if path.endswith(".warning.json"):
+                    hcid_alerts.append(hcid_message)
 
-                with open(full_path, "rt") as hcid_fh:
-                    hcid_message = json.load(hcid_fh)
+                uploads.append(
+                    (entry.path, s3_bucket, f"{payload['climb_id']}/{entry.name}")
+                )
 
-                hcid_alerts.append(hcid_message)
+        upload_exceptions = upload_files(
+            s3_client=s3_client, uploads=uploads, transfer_config=transfer_config
+        )
 
-            s3_key = f"{payload['climb_id']}/{path}"
+        for (path, _, _), upload_hcid_exception in zip(uploads, upload_exceptions):
+            if not upload_hcid_exception:
+                continue
 
-            try:
-                s3_client.upload_file(
-                    full_path,
-                    s3_bucket,
-                    s3_key,
-                )
+            if not isinstance(upload_hcid_exception, (ClientError, FileNotFoundError)):
+                raise upload_hcid_exception
 
-            except (ClientError, FileNotFoundError) as upload_hcid_exception:
-                log.error(
-                    f"Failed to upload HCID record to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {upload_hcid_exception}"
-                )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    f"Failed to upload HCID record {path} to storage bucket"
-                )
+            log.error(
+                "Failed to upload HCID record to long-term storage bucket for UUID: %s with CID: %s due to client error: %s",
+                payload["uuid"],
+                payload["climb_id"],
+                upload_hcid_exception,
+            )
+            add_ingest_error(
+                payload,
+                f"Failed to upload HCID record {os.path.basename(path)} to storage bucket",
+            )
 
-                hcid_fail = True
-                alert = True
+            hcid_fail = True
+            alert = True
 
     except Exception as e:
-        log.error(f"Unhandled exception in hcid warning parsing: {e}")
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            f"Unhandled exception in hcid warning parsing: {e}"
-        )
+        log.error("Unhandled exception in hcid warning parsing: %s", e)
+        add_ingest_error(payload, f"Unhandled exception in hcid warning parsing: {e}")
         hcid_fail = True
         alert = True
 
     return (hcid_fail, hcid_alerts, alert, payload)
 
 
-def validate(
+def create_validated_artifact(
     message: namedtuple,
     args: argparse.Namespace,
     ingest_pipe: pipeline,
-) -> tuple[bool, bool, dict, namedtuple]:
-    """Function to validate a single artifact and update the Onyx record accordingly
+    log: logging.Logger,
+) -> tuple[tuple[bool, bool, list, dict, namedtuple], dict | None]:
+    """Function to validate a single artifact and create its Onyx record, this is everything up to the upload / publish
+    stage (see publish_validated_artifact)
 
     Args:
         message (namedtuple): Varys message object for the current artifact
         args (argparse.Namespace): Command line arguments object
         ingest_pipe (pipeline): Instance of the ingest pipeline (see pipeline class)
+        log (logging.Logger): Logger object
 
     Returns:
-        tuple[bool, bool, dict, namedtuple]: Tuple containing a bool indicating whether the validation was successful, a bool indicating whether to squawk in the alert channel, the updated payload dict and the Varys message object
+        tuple[tuple[bool, bool, list, dict, namedtuple], dict | None]: Tuple containing the validation result tuple (a bool indicating whether the validation was successful, a bool indicating whether to squawk in the alert channel, a list of HCID alerts, the updated payload dict and the Varys message object) and, if the Onyx record was created, the keyword arguments to publish it with publish_validated_artifact, otherwise None
     """
-    s3_credentials = get_s3_credentials()
+    to_validate = orjson.loads(message.body)
 
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=s3_credentials.access_key,
-        aws_secret_access_key=s3_credentials.secret_key,
-        endpoint_url=s3_credentials.endpoint,
-    )
+    alert = False
+    hcid_alerts = False
 
-    log = logging.getLogger(f"{args.project}.ingest")
+    # Messages that are ignored are returned as they came in, so they only need the result fields
+    to_validate.setdefault("rerun", False)
+    to_validate.setdefault("ingest_errors", [])
 
-    to_validate = json.loads(message.body)
+    # This client is purely for Mscape/synthscape, ignore all other messages before doing any work on them
+    if to_validate["project"] != args.project:
+        log.info(
+            "Ignoring file set with UUID: %s due non-%s project ID",
+            to_validate["uuid"],
+            args.project,
+        )
+        return ((False, alert, hcid_alerts, to_validate, message), None)
 
-    payload = copy.deepcopy(to_validate)
+    if not to_validate["onyx_test_create_status"] or not to_validate["validate"]:
+        return ((False, alert, hcid_alerts, to_validate, message), None)
 
-    payload.setdefault("rerun", False)
+    # A second parse of the (small) message body is much cheaper than deep-copying the parsed dict
+    payload = orjson.loads(message.body)
 
-    alert = False
-    hcid_alerts = False
+    payload.setdefault("rerun", False)
+    payload.setdefault("ingest_errors", [])
 
     try:
         with s3_to_fh(
@@ -1215,32 +1739,20 @@ def validate(
             artifact_metadata = next(reader)
 
     except EtagMismatchError:
-        log.error(f"ETag mismatch for UUID: {payload['uuid']}")
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "CSV file appears to have been modified during validation, this is likely due to a resubmission which will be processed later."
+        log.error("ETag mismatch for UUID: %s", payload["uuid"])
+        add_ingest_error(
+            payload,
+            "CSV file appears to have been modified during validation, this is likely due to a resubmission which will be processed later.",
         )
-        return (False, alert, hcid_alerts, payload, message)
+        return ((False, alert, hcid_alerts, payload, message), None)
 
     except Exception as e:
         log.error(
-            f"Could not open CSV file for UUID: {payload['uuid']} due to error: {e}"
+            "Could not open CSV file for UUID: %s due to error: %s", payload["uuid"], e
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append("Could not open CSV file")
+        add_ingest_error(payload, "Could not open CSV file")
         payload["rerun"] = True
-        time.sleep(args.retry_delay)
-        return (False, alert, hcid_alerts, payload, message)
-
-    # This client is purely for Mscape/synthscape, ignore all other messages
-    if to_validate["project"] != args.project:
-        log.info(
-            f"Ignoring file set with UUID: {to_validate['uuid']} due non-{args.project} project ID"
-        )
-        return (False, alert, hcid_alerts, payload, message)
-
-    if not to_validate["onyx_test_create_status"] or not to_validate["validate"]:
-        return (False, alert, hcid_alerts, payload, message)
+        return ((False, alert, hcid_alerts, payload, message), None)
 
     if to_validate["platform"] in ("ont", "illumina.se"):
         unseen_check_fail, fastq_unseen, alert, payload = ensure_file_unseen(
@@ -1252,25 +1764,27 @@ def validate(
 
         if unseen_check_fail:
             log.error(
-                f"Failed to check if fastq file for UUID: {payload['uuid']} is unseen"
+                "Failed to check if fastq file for UUID: %s is unseen", payload["uuid"]
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"Failed to check if fastq file is unseen, please contact the {payload['project']} admin team"
+            add_ingest_error(
+                payload,
+                f"Failed to check if fastq file is unseen, please contact the {payload['project']} admin team",
             )
             payload["rerun"] = True
 
-            return (False, alert, hcid_alerts, payload, message)
+            return ((False, alert, hcid_alerts, payload, message), None)
 
         if not fastq_unseen:
             log.info(
-                f"Fastq file for UUID: {payload['uuid']} has already been ingested into the {payload['project']} project, skipping validation"
+                "Fastq file for UUID: %s has already been ingested into the %s project, skipping validation",
+                payload["uuid"],
+                payload["project"],
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"Fastq file appears identical to a previously ingested file, please ensure that the submission is not a duplicate. Please contact the {payload['project']} admin team if you believe this to be in error."
+            add_ingest_error(
+                payload,
+                f"Fastq file appears identical to a previously ingested file, please ensure that the submission is not a duplicate. Please contact the {payload['project']} admin team if you believe this to be in error.",
             )
-            return (False, alert, hcid_alerts, payload, message)
+            return ((False, alert, hcid_alerts, payload, message), None)
 
     elif to_validate["platform"] == "illumina":
 
@@ -1278,82 +1792,72 @@ def validate(
             to_validate["files"][".1.fastq.gz"]["etag"]
             == to_validate["files"][".2.fastq.gz"]["etag"]
         ):
-            payload.setdefault("ingest_errors", [])
-            log.info(f"Identical fastq files detected for UUID: {payload['uuid']}")
-            payload["ingest_errors"].append(
-                f"Identical fastq files detected, please ensure that the submitted paired fastqs are correct. Please contact the {payload['project']} admin team if you believe this to be in error."
-            )
-            return (False, alert, hcid_alerts, payload, message)
-
-        unseen_check_fail, fastq_1_unseen, alert, payload = ensure_file_unseen(
-            etag_field="fastq_1_etag",
-            etag=to_validate["files"][".1.fastq.gz"]["etag"],
-            log=log,
-            payload=payload,
-        )
-        if unseen_check_fail:
-            log.error(
-                f"Failed to check if fastq file for UUID: {payload['uuid']} is unseen"
-            )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"Failed to check if fastq file is unseen, please contact the {payload['project']} admin team"
+            log.info("Identical fastq files detected for UUID: %s", payload["uuid"])
+            add_ingest_error(
+                payload,
+                f"Identical fastq files detected, please ensure that the submitted paired fastqs are correct. Please contact the {payload['project']} admin team if you believe this to be in error.",
             )
-            payload["rerun"] = True
+            return ((False, alert, hcid_alerts, payload, message), None)
 
-            return (False, alert, hcid_alerts, payload, message)
-
-        unseen_check_fail, fastq_2_unseen, alert, payload = ensure_file_unseen(
-            etag_field="fastq_2_etag",
-            etag=to_validate["files"][".2.fastq.gz"]["etag"],
+        unseen_check_fail, fastqs_unseen, alert, payload = ensure_files_unseen(
+            etags={
+                "fastq_1_etag": to_validate["files"][".1.fastq.gz"]["etag"],
+                "fastq_2_etag": to_validate["files"][".2.fastq.gz"]["etag"],
+            },
             log=log,
             payload=payload,
         )
 
         if unseen_check_fail:
             log.error(
-                f"Failed to check if fastq file for UUID: {payload['uuid']} is unseen"
+                "Failed to check if fastq file for UUID: %s is unseen", payload["uuid"]
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"Failed to check if fastq file is unseen, please contact the {payload['project']} admin team"
+            add_ingest_error(
+                payload,
+                f"Failed to check if fastq file is unseen, please contact the {payload['project']} admin team",
             )
             payload["rerun"] = True
 
-            return (False, alert, hcid_alerts, payload, message)
+            return ((False, alert, hcid_alerts, payload, message), None)
 
-        if not fastq_1_unseen or not fastq_2_unseen:
+        if not all(fastqs_unseen.values()):
             log.info(
-                f"Fastq file for UUID: {payload['uuid']} has already been ingested into the {payload['project']} project, skipping validation"
+                "Fastq file for UUID: %s has already been ingested into the %s project, skipping validation",
+                payload["uuid"],
+                payload["project"],
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"At least one submitted fastq file appears identical to a previously ingested file, please ensure that the submission is not a duplicate. Please contact the {payload['project']} admin team if you believe this to be in error."
+            add_ingest_error(
+                payload,
+                f"At least one submitted fastq file appears identical to a previously ingested file, please ensure that the submission is not a duplicate. Please contact the {payload['project']} admin team if you believe this to be in error.",
             )
-            return (False, alert, hcid_alerts, payload, message)
+            return ((False, alert, hcid_alerts, payload, message), None)
 
     rc = execute_validation_pipeline(
         payload=payload,
         args=args,
         ingest_pipe=ingest_pipe,
         spike_in=artifact_metadata.get("spike_in"),
+        log=log,
     )
 
-    log.info(
-        f"Execution of pipeline for UUID: {payload['uuid']} complete. Command was: {' '.join(str(x) for x in ingest_pipe.cmd)}"
-    )
-
-    args.result_dir = Path(args.result_dir)
+    if log.isEnabledFor(logging.INFO):
+        log.info(
+            "Execution of pipeline for UUID: %s complete. Command was: %s",
+            payload["uuid"],
+            " ".join(str(x) for x in ingest_pipe.cmd),
+        )
 
-    result_path = Path(args.result_dir.resolve(), payload["uuid"])
+    # run() has already resolved it, but callers building args themselves may pass a str
+    result_path = Path(args.result_dir, payload["uuid"])
 
     if rc != 0:
         log.error(
-            f"Validation pipeline exited with non-0 exit code: {rc} for UUID: {payload['uuid']}"
+            "Validation pipeline exited with non-0 exit code: %s for UUID: %s",
+            rc,
+            payload["uuid"],
         )
         payload["rerun"] = True
-        time.sleep(args.retry_delay)
-        return (False, alert, hcid_alerts, payload, message)
+        return ((False, alert, hcid_alerts, payload, message), None)
 
     ingest_fail, payload = ret_0_parser(
         log=log,
@@ -1362,15 +1866,17 @@ def validate(
     )
 
     if ingest_fail:
-        log.info(f"Validation pipeline failed for UUID: {payload['uuid']}")
-        return (False, alert, hcid_alerts, payload, message)
+        log.info("Validation pipeline failed for UUID: %s", payload["uuid"])
+        return ((False, alert, hcid_alerts, payload, message), None)
 
     if payload["test_flag"]:
         log.info(
-            f"Test ingest for artifact: {payload['artifact']} with UUID: {payload['uuid']} completed successfully"
+            "Test ingest for artifact: %s with UUID: %s completed successfully",
+            payload["artifact"],
+            payload["uuid"],
         )
         payload["test_ingest_result"] = True
-        return (True, alert, hcid_alerts, payload, message)
+        return ((True, alert, hcid_alerts, payload, message), None)
 
     # Spot if metadata disagrees anywhere, don't act on it yet though
     source_reconcile_success, alert, payload = onyx_reconcile(
@@ -1417,122 +1923,221 @@ def validate(
 
     if alert:
         log.error(
-            f"Failed to create Onyx record for UUID: {payload['uuid']}, catastrophic error"
+            "Failed to create Onyx record for UUID: %s, catastrophic error",
+            payload["uuid"],
         )
         payload["rerun"] = True
-        time.sleep(args.retry_delay)
-        return (False, alert, hcid_alerts, payload, message)
+        return ((False, alert, hcid_alerts, payload, message), None)
 
     if not create_success:
-        log.info(f"Failed to submit to Onyx for UUID: {payload['uuid']}")
-        return (False, alert, hcid_alerts, payload, message)
+        log.info("Failed to submit to Onyx for UUID: %s", payload["uuid"])
+        return ((False, alert, hcid_alerts, payload, message), None)
 
     payload["onyx_create_status"] = True
     payload["created"] = True
 
-    scylla_version_fail, alert, payload = onyx_update(
-        payload=payload,
-        fields={"scylla_version": payload["scylla_version"]},
-        log=log,
+    return (
+        (False, alert, hcid_alerts, payload, message),
+        {
+            "message": message,
+            "args": args,
+            "log": log,
+            "payload": payload,
+            "artifact_metadata": artifact_metadata,
+            "result_path": result_path,
+            "alert": alert,
+        },
     )
 
-    if scylla_version_fail:
-        log.error(f"Failed to update Onyx record for UUID: {payload['uuid']}")
-        return (False, alert, hcid_alerts, payload, message)
+
+def validate(
+    message: namedtuple,
+    args: argparse.Namespace,
+    ingest_pipe: pipeline,
+    log: logging.Logger = None,
+) -> tuple[bool, bool, list, dict, namedtuple]:
+    """Function to validate a single artifact and update the Onyx record accordingly
+
+    Args:
+        message (namedtuple): Varys message object for the current artifact
+        args (argparse.Namespace): Command line arguments object
+        ingest_pipe (pipeline): Instance of the ingest pipeline (see pipeline class)
+        log (logging.Logger, optional): Logger object. Defaults to None (the project ingest logger).
+
+    Returns:
+        tuple[bool, bool, list, dict, namedtuple]: Tuple containing a bool indicating whether the validation was successful, a bool indicating whether to squawk in the alert channel, a list of HCID alerts, the updated payload dict and the Varys message object
+    """
+    if log is None:
+        log = logging.getLogger(f"{args.project}.ingest")
+
+    validate_result, publish_kwargs = create_validated_artifact(
+        message=message, args=args, ingest_pipe=ingest_pipe, log=log
+    )
+
+    if publish_kwargs is None:
+        return validate_result
+
+    return publish_validated_artifact(**publish_kwargs)
+
+
+def publish_validated_artifact(
+    message: namedtuple,
+    args: argparse.Namespace,
+    log: logging.Logger,
+    payload: dict,
+    artifact_metadata: dict,
+    result_path: Path,
+    alert: bool = False,
+) -> tuple[bool, bool, list, dict, namedtuple]:
+    """Function to upload the outputs of a successful validation run to long-term storage and publish the Onyx record
+
+    Args:
+        message (namedtuple): Varys message object for the current artifact
+        args (argparse.Namespace): Command line arguments object
+        log (logging.Logger): Logger object
+        payload (dict): Payload dict for the created Onyx record
+        artifact_metadata (dict): Metadata row from the submitted CSV
+        result_path (Path): Path to the results directory for this artifact
+        alert (bool, optional): Whether to squawk in the alert channel so far. Defaults to False.
+
+    Returns:
+        tuple[bool, bool, list, dict, namedtuple]: Tuple containing a bool indicating whether the validation was successful, a bool indicating whether to squawk in the alert channel, a list of HCID alerts, the updated payload dict and the Varys message object
+    """
+    s3_client = get_s3_client()
+
+    hcid_alerts = False
 
     if payload["platform"] == "illumina":
-        etag_fail, alert, payload = onyx_update(
-            payload=payload,
-            log=log,
-            fields={
-                "fastq_1_etag": payload["files"][".1.fastq.gz"]["etag"],
-                "fastq_2_etag": payload["files"][".2.fastq.gz"]["etag"],
-            },
-        )
+        etag_fields = {
+            "fastq_1_etag": payload["files"][".1.fastq.gz"]["etag"],
+            "fastq_2_etag": payload["files"][".2.fastq.gz"]["etag"],
+        }
 
     elif payload["platform"] in ("ont", "illumina.se"):
-        etag_fail, alert, payload = onyx_update(
-            payload=payload,
-            log=log,
-            fields={"fastq_1_etag": payload["files"][".fastq.gz"]["etag"]},
-        )
+        etag_fields = {"fastq_1_etag": payload["files"][".fastq.gz"]["etag"]}
 
     else:
-        log.error(f"Unknown platform: {payload['platform']}")
+        log.error("Unknown platform: %s", payload["platform"])
         return (False, alert, hcid_alerts, payload, message)
 
-    if etag_fail:
+    pipeline_env = get_pipeline_env()
+
+    # Everything known about the record before the uploads goes to Onyx in a single update
+    metadata_fail, alert, payload = onyx_update(
+        payload=payload,
+        fields={
+            "scylla_version": payload["scylla_version"],
+            **etag_fields,
+            "classifier": "kraken2",
+            "classifier_version": "2.1.2",
+            "classifier_db": pipeline_env.classifier_db,
+            "classifier_db_date": pipeline_env.classifier_db_date,
+            "ncbi_taxonomy_date": pipeline_env.ncbi_taxonomy_date,
+        },
+        log=log,
+    )
+
+    if metadata_fail:
+        log.error("Failed to update Onyx record for UUID: %s", payload["uuid"])
+        # The record exists but is unpublished, so it has to be retried (this update includes the classifier fields)
+        payload["rerun"] = True
         return (False, alert, hcid_alerts, payload, message)
 
     log.info(
-        f"Uploading files to long-term storage buckets for CID: {payload['climb_id']} after sucessful Onyx submission"
+        "Uploading files to long-term storage buckets for CID: %s after sucessful Onyx submission",
+        payload["climb_id"],
     )
 
-    raw_read_fail, reads_alert, payload = add_reads_record(
-        payload=payload,
-        s3_client=s3_client,
-        result_path=result_path,
-        log=log,
-    )
+    transfer_config = get_transfer_config()
 
-    binned_read_fail, taxa_alert, payload = add_taxon_records(
-        payload=payload, result_path=result_path, log=log, s3_client=s3_client
+    # Dehumanised reads are at most the size of the submitted reads, so size their multipart chunks from those
+    reads_transfer_config = get_transfer_config(
+        content_length=max(
+            (
+                file_info.get("content_length", 0)
+                for file_info in payload["files"].values()
+            ),
+            default=0,
+        ),
     )
 
+    # The helpers share the payload and the Onyx record so run them one after another, the S3 uploads
+    # within each helper are still spread over the shared upload executor
     classifier_calls_fail, classifier_alert, payload = add_classifier_calls(
         payload=payload, result_path=result_path, log=log
     )
 
-    # Consider making this a little more versatile in future
+    raw_read_fail, reads_alert, reads_fields, payload = add_reads_record(
+        payload=payload,
+        s3_client=s3_client,
+        result_path=result_path,
+        log=log,
+        transfer_config=reads_transfer_config,
+    )
 
-    classifier_splits = os.getenv("SCYLLA_K2_DB_PATH").split("/")
-    non_empty = [x for x in classifier_splits if x != ""]
-    classifier_db = non_empty[-1]
+    binned_read_fail, taxa_alert, payload = add_taxon_records(
+        payload=payload,
+        result_path=result_path,
+        log=log,
+        s3_client=s3_client,
+        transfer_config=transfer_config,
+    )
 
-    classifier_metadata_fail, classifier_metadata_alert, payload = onyx_update(
+    report_fail, report_alert, report_fields, payload = push_report_file(
         payload=payload,
-        fields={
-            "classifier": "kraken2",
-            "classifier_version": "2.1.2",
-            "classifier_db": classifier_db,
-            "classifier_db_date": os.getenv("SCYLLA_K2_DB_DATE"),
-            "ncbi_taxonomy_date": os.getenv("SCYLLA_TAXONOMY_DATE"),
-        },
+        result_path=result_path,
         log=log,
+        s3_client=s3_client,
+        transfer_config=transfer_config,
+    )
+
+    taxon_report_fail, taxa_reports_alert, taxon_report_fields, payload = (
+        push_taxon_reports(
+            payload=payload,
+            result_path=result_path,
+            log=log,
+            s3_client=s3_client,
+            transfer_config=transfer_config,
+        )
     )
 
     fraction_fail_outer = False
 
-    for fraction in (
-        "human_filtered",
-        "unclassified",
-        "viral_and_unclassified",
-        "viral",
-    ):
-        fraction_fail_inner, fraction_alert, payload = read_fraction_upload(
+    if args.tar_read_fractions:
+        fraction_fail_outer, fraction_alert, payload = read_fractions_tar_upload(
             payload=payload,
             s3_client=s3_client,
             result_path=result_path,
             log=log,
-            fraction_prefix=fraction,
+            transfer_config=transfer_config,
         )
 
         if fraction_alert:
             alert = True
 
-        if fraction_fail_inner:
-            fraction_fail_outer = True
+    else:
+        for fraction in _READ_FRACTIONS:
+            fraction_fail_inner, fraction_alert, payload = read_fraction_upload(
+                payload=payload,
+                s3_client=s3_client,
+                result_path=result_path,
+                log=log,
+                fraction_prefix=fraction,
+                transfer_config=transfer_config,
+            )
 
-    report_fail, report_alert, payload = push_report_file(
-        payload=payload, result_path=result_path, log=log, s3_client=s3_client
-    )
+            if fraction_alert:
+                alert = True
 
-    taxon_report_fail, taxa_reports_alert, payload = push_taxon_reports(
-        payload=payload, result_path=result_path, log=log, s3_client=s3_client
-    )
+            if fraction_fail_inner:
+                fraction_fail_outer = True
 
     hcid_fail, hcid_alerts, hcid_alert, payload = handle_hcid(
-        log=log, payload=payload, result_path=result_path, s3_client=s3_client
+        log=log,
+        payload=payload,
+        result_path=result_path,
+        s3_client=s3_client,
+        transfer_config=transfer_config,
     )
 
     spike_in_fail, spike_in_alert, payload = handle_spike_ins(
@@ -1548,7 +2153,6 @@ def validate(
         or report_alert
         or taxa_reports_alert
         or classifier_alert
-        or classifier_metadata_alert
         or hcid_alert
         or spike_in_alert
     ):
@@ -1561,27 +2165,36 @@ def validate(
         or taxon_report_fail
         or fraction_fail_outer
         or classifier_calls_fail
-        or classifier_metadata_fail
         or hcid_fail
         or spike_in_fail
     ):
         log.error(
-            f"Failed to upload files to S3 or update Onyx for CID: {payload['climb_id']} with match UUID: {payload['uuid']}"
+            "Failed to upload files to S3 or update Onyx for CID: %s with match UUID: %s",
+            payload["climb_id"],
+            payload["uuid"],
         )
         payload["rerun"] = True
-        time.sleep(args.retry_delay)
         return (False, alert, hcid_alerts, payload, message)
 
+    # The file URIs are only written once every upload has succeeded, together with the publish flag
     publish_fail, alert, payload = onyx_update(
-        payload=payload, log=log, fields={"is_published": True}
+        payload=payload,
+        log=log,
+        fields={
+            **reads_fields,
+            **report_fields,
+            **taxon_report_fields,
+            "is_published": True,
+        },
     )
 
     if alert:
         log.error(
-            f"Failed to update Onyx record for UUID: {payload['uuid']} with CID: {payload['climb_id']}"
+            "Failed to update Onyx record for UUID: %s with CID: %s",
+            payload["uuid"],
+            payload["climb_id"],
         )
         payload["rerun"] = True
-        time.sleep(args.retry_delay)
         return (False, alert, hcid_alerts, payload, message)
 
     if publish_fail:
@@ -1589,14 +2202,70 @@ def validate(
 
     payload["published"] = True
     log.info(
-        f"Sending successful ingest result for UUID: {payload['uuid']}, with CID: {payload['climb_id']}"
+        "Sending successful ingest result for UUID: %s, with CID: %s",
+        payload["uuid"],
+        payload["climb_id"],
     )
 
     return (True, alert, hcid_alerts, payload, message)
 
 
+HEALTH_FILE = "/tmp/healthy"
+
+
+def _health_heartbeat(interval: float = 10) -> None:
+    """Refresh the mtime of the health file every interval seconds so liveness checks can spot a stale process.
+    Stops once the file has been removed so a process that has been marked unhealthy is never revived
+
+    Args:
+        interval (float, optional): Seconds between refreshes. Defaults to 10.
+    """
+    while True:
+        time.sleep(interval)
+
+        try:
+            os.utime(HEALTH_FILE, None)
+
+        except FileNotFoundError:
+            break
+
+
 def run(args):
-    log = init_logger(f"{args.project}.ingest", args.logfile, args.log_level)
+    allowed_cpus = sorted(os.sched_getaffinity(0))
+
+    pin_consumer = args.pin_consumer and len(allowed_cpus) > 1
+
+    if pin_consumer:
+        # Affinity and scheduling policy only apply to the calling thread and are copied to threads it creates,
+        # so pin before the log listener and Varys threads are started. The workers undo it for themselves
+        os.sched_setaffinity(0, allowed_cpus[:1])
+        os.sched_setscheduler(0, os.SCHED_BATCH, os.sched_param(0))
+
+    log = init_logger(
+        f"{args.project}.ingest", args.logfile, args.log_level, non_blocking=True
+    )
+
+    if not ensure_buckets_reachable(
+        s3_client=get_s3_client(),
+        buckets=[
+            f"{args.project}-published-{suffix}"
+            for suffix in (
+                "reads",
+                "read-fractions",
+                "binned-reads",
+                "reports",
+                "taxon-reports",
+                "hcid",
+            )
+        ],
+        log=log,
+    ):
+        raise RuntimeError(
+            f"One or more {args.project} published buckets could not be reached"
+        )
+
+    # Resolved once here so the workers inherit an absolute path rather than resolving it per message
+    args.result_dir = args.result_dir.resolve()
 
     varys_client = Varys(
         profile="roz",
@@ -1619,29 +2288,65 @@ def run(args):
         logger=log,
         varys_client=varys_client,
         project=args.project,
+        args=args,
+        ingest_pipe=ingest_pipe,
+        retry_delay=args.retry_delay,
+        worker_cpus=allowed_cpus[1:] if pin_consumer else None,
     )
+
+    Path(HEALTH_FILE).touch()
+    threading.Thread(target=_health_heartbeat, daemon=True).start()
+
+    to_validate_exchange = f"inbound-to_validate-{args.project}"
+
     try:
         while True:
-            time.sleep(0.5)
+            # Varys pushes deliveries onto an in-process queue from its consumer thread, so this blocks until one arrives
             message = varys_client.receive(
-                exchange=f"inbound-to_validate-{args.project}",
+                exchange=to_validate_exchange,
                 queue_suffix="validator",
-                prefetch_count=args.n_workers,
+                prefetch_count=args.prefetch_count,
             )
 
-            worker_pool.submit_job(message=message, args=args, ingest_pipe=ingest_pipe)
+            # Drain anything else already delivered under the prefetch window so it is dispatched together
+            batch = [
+                message,
+                *varys_client.receive_batch(
+                    exchange=to_validate_exchange,
+                    queue_suffix="validator",
+                    timeout=0,
+                ),
+            ]
+
+            worker_pool.submit_job_batch(messages=batch)
     except BaseException as e:
-        log.info(f"Shutting down worker pool due to exception: {e}")
-        os.remove("/tmp/healthy")
-        worker_pool.close()
+        log.info("Shutting down worker pool due to exception: %s", e)
+        os.remove(HEALTH_FILE)
+        worker_pool.close(timeout=args.shutdown_timeout)
         varys_client.close()
-        time.sleep(1)
         sys.exit(1)
 
 
-def main():
-    import argparse
+REQUIRED_ENV_VARS = (
+    "ONYX_DOMAIN",
+    "ONYX_TOKEN",
+    "VARYS_CFG",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "SCYLLA_K2_DB_PATH",
+    "SCYLLA_K2_DB_DATE",
+    "SCYLLA_TAXONOMY_PATH",
+    "SCYLLA_TAXONOMY_DATE",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def get_args() -> argparse.Namespace:
+    """Parse the command line arguments, this is only done once per process and the result is reused
 
+    Returns:
+        argparse.Namespace: Command line arguments object
+    """
     parser = argparse.ArgumentParser()
     parser.add_argument("--logfile", type=Path)
     parser.add_argument("--log_level", type=str, default="DEBUG")
@@ -1653,25 +2358,39 @@ def main():
     parser.add_argument("--k2_host", type=str)
     parser.add_argument("--result_dir", type=Path)
     parser.add_argument("--n_workers", type=int, default=5)
+    parser.add_argument("--prefetch_count", type=int, default=100)
     parser.add_argument("--retry-delay", type=int, default=180)
+    parser.add_argument(
+        "--shutdown_timeout",
+        type=int,
+        default=60,
+        help="Seconds to wait for in-flight jobs on shutdown before terminating the workers",
+    )
+    parser.add_argument(
+        "--pin_consumer",
+        action="store_true",
+        help="Pin the consumer to one CPU with SCHED_BATCH and keep the worker processes off it",
+    )
+    parser.add_argument(
+        "--tar_read_fractions",
+        action="store_true",
+        help="Upload the read fractions as a single tar object rather than one object per fraction, requires the read_fractions_tar field in the project's Onyx schema",
+    )
 
-    global args
-    args = parser.parse_args()
-
-    for i in (
-        "ONYX_DOMAIN",
-        "ONYX_TOKEN",
-        "VARYS_CFG",
-        "AWS_ACCESS_KEY_ID",
-        "AWS_SECRET_ACCESS_KEY",
-        "SCYLLA_K2_DB_PATH",
-        "SCYLLA_K2_DB_DATE",
-        "SCYLLA_TAXONOMY_PATH",
-        "SCYLLA_TAXONOMY_DATE",
-    ):
-        if not os.getenv(i):
-            print(f"The environmental variable '{i}' has not been set", file=sys.stderr)
-            sys.exit(3)
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    missing = [i for i in REQUIRED_ENV_VARS if not os.getenv(i)]
+
+    if missing:
+        print(
+            f"The following environmental variables have not been set: {', '.join(missing)}",
+            file=sys.stderr,
+        )
+        sys.exit(3)
 
     run(args)
 
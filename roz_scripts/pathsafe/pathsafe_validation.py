@@ -2,14 +2,18 @@ import os
 from pathlib import Path
 import boto3
 from botocore.exceptions import ClientError
-import json
-import copy
+import orjson
 import argparse
 import logging
 import csv
+import gzip
+import zlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import multiprocessing as mp
+import threading
 import sys
 
 
@@ -18,43 +22,112 @@ from roz_scripts.utils.utils import (
     onyx_update,
     pipeline,
     init_logger,
-    get_s3_credentials,
+    get_s3_client,
     put_result_json,
     put_linkage_json,
-    get_onyx_credentials,
-    ensure_file_unseen,
+    get_onyx_client,
+    ensure_files_unseen,
     s3_to_fh,
+    upload_local_file,
+    add_ingest_error,
     EtagMismatchError,
 )
 from varys import Varys
-from onyx import OnyxClient
+
+
+def _worker_loop(
+    job_queue: mp.Queue,
+    result_queue: mp.Queue,
+    args: argparse.Namespace,
+    ingest_pipe: pipeline,
+) -> None:
+    """Entry point for a persistent validation worker process, pulls jobs from the job queue
+    until a None sentinel is received and pushes each result back onto the result queue
+
+    Args:
+        job_queue (mp.Queue): Queue of Varys messages to validate
+        result_queue (mp.Queue): Queue of (completed, result) tuples, where result is either the validate return value or the exception string
+        args (argparse.Namespace): Command line arguments object, fixed for the lifetime of the worker
+        ingest_pipe (pipeline): This worker's own instance of the ingest pipeline (see pipeline class)
+    """
+
+    while True:
+        message = job_queue.get()
+
+        if message is None:
+            break
+
+        try:
+            result_queue.put(
+                (True, validate(message=message, args=args, ingest_pipe=ingest_pipe))
+            )
+
+        except Exception as worker_exception:
+            result_queue.put((False, str(worker_exception)))
 
 
 class worker_pool_handler:
-    def __init__(self, workers, logger, varys_client):
+    def __init__(self, workers, logger, varys_client, args, ingest_pipe):
         self._log = logger
-        self.worker_pool = mp.Pool(processes=workers)
         self._varys_client = varys_client
 
+        # The workers rely on inheriting the parent's state at fork (args, ingest_pipe and any clients), so don't
+        # leave the start method to the platform default
+        mp_context = mp.get_context("fork")
+
+        self._job_queue = mp_context.Queue()
+        self._result_queue = mp_context.Queue()
+
+        self._workers = [
+            mp_context.Process(
+                target=_worker_loop,
+                # Each worker gets its own copy of these at fork so they aren't pickled with every job
+                args=(self._job_queue, self._result_queue, args, ingest_pipe),
+                daemon=True,
+            )
+            for _ in range(workers)
+        ]
+
+        for worker in self._workers:
+            worker.start()
+
+        self._result_handler = threading.Thread(
+            target=self._handle_results, daemon=True
+        )
+        self._result_handler.start()
+
         self._log.info(f"Successfully initialised worker pool with {workers} workers")
 
         self._retry_log = {}
 
-    def submit_job(self, message, args, ingest_pipe):
-        self._log.info(
-            f"Submitting job to the worker pool for UUID: {json.loads(message.body)['uuid']}"
-        )
+    def submit_job(self, message):
+        uuid = orjson.loads(message.body)["uuid"]
 
-        self._retry_log.setdefault(json.loads(message.body)["uuid"], 0)
+        self._log.info(f"Submitting job to the worker pool for UUID: {uuid}")
 
-        self._retry_log[json.loads(message.body)["uuid"]] += 1
+        self._retry_log.setdefault(uuid, 0)
 
-        self.worker_pool.apply_async(
-            func=validate,
-            kwds={"message": message, "args": args, "ingest_pipe": ingest_pipe},
-            callback=self.callback,
-            error_callback=self.error_callback,
-        )
+        self._retry_log[uuid] += 1
+
+        self._job_queue.put(message)
+
+    def submit_job_batch(self, messages):
+        for message in messages:
+            self.submit_job(message=message)
+
+    def _handle_results(self):
+        while True:
+            result = self._result_queue.get()
+
+            if result is None:
+                break
+
+            completed, validate_result = result
+
+            if completed:
+                self.callback(validate_result)
+            else:
+                self.error_callback(validate_result)
 
     def callback(self, validate_result):
         success, payload, message = validate_result
@@ -105,9 +178,9 @@ class worker_pool_handler:
                     self._log.error(
                         f"Message for UUID: {payload['uuid']} failed after {self._retry_log[payload['uuid']]} attempts, sending to dead letter queue"
                     )
-                    payload.setdefault("ingest_errors", [])
-                    payload["ingest_errors"].append(
-                        f"Validation failed for UUID: {payload['uuid']} unrecoverably"
+                    add_ingest_error(
+                        payload,
+                        f"Validation failed for UUID: {payload['uuid']} unrecoverably",
                     )
 
                     self._varys_client.send(
@@ -159,9 +232,30 @@ class worker_pool_handler:
         os.remove("/tmp/healthy")
         sys.exit(1)
 
-    def close(self):
-        self.worker_pool.close()
-        self.worker_pool.join()
+    def close(self, timeout=None):
+        for _ in self._workers:
+            self._job_queue.put(None)
+
+        # Workers still mid-job after the timeout are stopped, their messages are unacked so they get redelivered
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        for worker in self._workers:
+            worker.join(
+                None if deadline is None else max(0, deadline - time.monotonic())
+            )
+
+            if worker.is_alive():
+                self._log.info(
+                    f"Worker {worker.pid} did not finish within the shutdown timeout, terminating"
+                )
+                worker.terminate()
+                worker.join()
+
+        # A terminated worker can leave the result queue's write lock held, so don't wait on the handler forever
+        self._result_queue.put(None)
+        self._result_handler.join(
+            None if deadline is None else max(1, deadline - time.monotonic())
+        )
 
 
 def assembly_to_s3(
@@ -189,10 +283,11 @@ def assembly_to_s3(
     )
 
     try:
-        s3_client.upload_file(
-            assembly_path,
-            "pathsafe-published-assembly",
-            f"{payload['climb_id']}.assembly.fasta",
+        upload_local_file(
+            s3_client=s3_client,
+            path=assembly_path,
+            bucket="pathsafe-published-assembly",
+            key=f"{payload['climb_id']}.assembly.fasta",
         )
 
         payload["assembly_presigned_url"] = s3_client.generate_presigned_url(
@@ -208,7 +303,7 @@ def assembly_to_s3(
         log.error(
             f"Failed to upload assembly to long-term storage bucket for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to client error: {e}"
         )
-        payload["ingest_errors"].append("Failed to upload assembly to storage bucket")
+        add_ingest_error(payload, "Failed to upload assembly to storage bucket")
         s3_fail = True
 
     if not s3_fail:
@@ -226,6 +321,54 @@ def assembly_to_s3(
     return (s3_fail, payload)
 
 
+_pathogenwatch_sessions = threading.local()
+
+# How long a worker reuses the Pathogenwatch folder list before fetching it again
+_PATHOGENWATCH_FOLDER_TTL = 300
+
+
+def get_pathogenwatch_session() -> requests.Session:
+    """Get a requests session for the Pathogenwatch API so connections are reused between submissions. Sessions
+    should not be shared between threads or across a fork so one is kept per thread, per process. Only idempotent
+    requests are retried, genome creates are never resent
+
+    Returns:
+        requests.Session: Session object for Pathogenwatch requests
+    """
+    if getattr(_pathogenwatch_sessions, "pid", None) != os.getpid():
+        session = requests.Session()
+        session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=8,
+                pool_maxsize=8,
+                max_retries=Retry(
+                    total=5,
+                    backoff_factor=0.2,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    raise_on_status=False,
+                ),
+            ),
+        )
+
+        _pathogenwatch_sessions.session = session
+        _pathogenwatch_sessions.pid = os.getpid()
+
+    return _pathogenwatch_sessions.session
+
+
+def reset_pathogenwatch_session() -> None:
+    """Close and drop this thread's cached Pathogenwatch session and folder list, so the next submission starts
+    afresh (e.g. between tests)
+    """
+    session = getattr(_pathogenwatch_sessions, "session", None)
+
+    if session is not None:
+        session.close()
+
+    _pathogenwatch_sessions.__dict__.clear()
+
+
 def pathogenwatch_submission(
     payload: dict, log: logging.getLogger
 ) -> tuple[bool, dict]:
@@ -241,10 +384,8 @@ def pathogenwatch_submission(
     """
     pathogenwatch_fail = False
 
-    onyx_config = get_onyx_credentials()
-
     log.info(f"Submitting to Pathogenwatch for UUID: {payload['uuid']}")
-    with OnyxClient(config=onyx_config) as client:
+    with get_onyx_client() as client:
         record = client.get(
             "pathsafe",
             payload["climb_id"],
@@ -259,34 +400,46 @@ def pathogenwatch_submission(
 
     base_url = os.getenv("PATHOGENWATCH_ENDPOINT_URL")
 
-    try:
-        resp = requests.get(f"{base_url}/folders/list?user_owned=true", headers=headers)
+    session = get_pathogenwatch_session()
+
+    # The folder list rarely changes so it is reused for a while rather than fetched for every genome
+    folders_expiry, folders = getattr(_pathogenwatch_sessions, "folders", (0, None))
 
-        if resp.status_code != 200:
+    if folders_expiry < time.monotonic():
+        try:
+            resp = session.get(
+                f"{base_url}/folders/list?user_owned=true", headers=headers
+            )
+
+            if resp.status_code != 200:
+                log.error(
+                    f"Failed to retrieve Pathogenwatch folders due to error: {resp.text}"
+                )
+                add_ingest_error(
+                    payload,
+                    f"Failed to retrieve Pathogenwatch folders due to error: {resp.text}",
+                )
+                pathogenwatch_fail = True
+                payload["rerun"] = True
+                return (pathogenwatch_fail, payload)
+
+            folders = resp.json()
+
+        except requests.exceptions.RequestException as e:
             log.error(
-                f"Failed to retrieve Pathogenwatch folders due to error: {resp.text}"
+                f"Failed to retrieve Pathogenwatch folders due to error: {e}, sending result"
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"Failed to retrieve Pathogenwatch folders due to error: {resp.text}"
+            add_ingest_error(
+                payload, f"Failed to retrieve Pathogenwatch folders due to error: {e}"
             )
             pathogenwatch_fail = True
             payload["rerun"] = True
             return (pathogenwatch_fail, payload)
 
-        folders = resp.json()
-
-    except requests.exceptions.RequestException as e:
-        log.error(
-            f"Failed to retrieve Pathogenwatch folders due to error: {e}, sending result"
+        _pathogenwatch_sessions.folders = (
+            time.monotonic() + _PATHOGENWATCH_FOLDER_TTL,
+            folders,
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            f"Failed to retrieve Pathogenwatch folders due to error: {e}"
-        )
-        pathogenwatch_fail = True
-        payload["rerun"] = True
-        return (pathogenwatch_fail, payload)
 
     folder_id = False
 
@@ -296,12 +449,15 @@ def pathogenwatch_submission(
             break
 
     if not folder_id:
+        # The site's folder may have been added since the list was fetched, so fetch it again next time
+        _pathogenwatch_sessions.folders = (0, None)
+
         log.error(
             f"Failed to retrieve Pathogenwatch folder ID for site: {payload['site']}"
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            f"Failed to retrieve Pathogenwatch folder ID for site: {payload['site']}"
+        add_ingest_error(
+            payload,
+            f"Failed to retrieve Pathogenwatch folder ID for site: {payload['site']}",
         )
         pathogenwatch_fail = True
         return (pathogenwatch_fail, payload)
@@ -319,15 +475,15 @@ def pathogenwatch_submission(
     }
 
     try:
-        r = requests.post(url=f"{base_url}/genomes/create", headers=headers, json=body)
+        r = session.post(url=f"{base_url}/genomes/create", headers=headers, json=body)
 
         if r.status_code != 201:
             log.error(
                 f"Pathogenwatch submission failed for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to error: {r.text}"
             )
-            payload.setdefault("ingest_errors", [])
-            payload["ingest_errors"].append(
-                f"Pathogenwatch submission failed with status code: {r.status_code}, due to error: {r.text}"
+            add_ingest_error(
+                payload,
+                f"Pathogenwatch submission failed with status code: {r.status_code}, due to error: {r.text}",
             )
             pathogenwatch_fail = True
             payload["rerun"] = True
@@ -339,10 +495,7 @@ def pathogenwatch_submission(
         log.error(
             f"Failed to submit genome to Pathogenwatch for UUID: {payload['uuid']} with CID: {payload['climb_id']} due to error: {e}"
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            f"Pathogenwatch submission failed due to error: {e}"
-        )
+        add_ingest_error(payload, f"Pathogenwatch submission failed due to error: {e}")
         pathogenwatch_fail = True
         payload["rerun"] = True
         return (pathogenwatch_fail, payload)
@@ -461,7 +614,7 @@ def ret_0_parser(
         log.error(
             f"Could not open pipeline trace for UUID: {payload['uuid']} despite NXF exit code 0 due to error: {e}"
         )
-        payload["ingest_errors"].append("couldn't open nxf ingest pipeline trace")
+        add_ingest_error(payload, "couldn't open nxf ingest pipeline trace")
         ingest_fail = True
 
     for process, trace in trace_dict.items():
@@ -470,17 +623,16 @@ def ret_0_parser(
                 log.info(
                     f"Etoki assembly failed for UUID: {payload['uuid']}, exit code: 255"
                 )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    "Etoki assembly (spades) failed with exit code 255, most likely due to mangled quality strings, please check the fastq files and re-upload after fixing the quality scores"
+                add_ingest_error(
+                    payload,
+                    "Etoki assembly (spades) failed with exit code 255, most likely due to mangled quality strings, please check the fastq files and re-upload after fixing the quality scores",
                 )
                 ingest_fail = True
                 continue
 
-            payload.setdefault("ingest_errors", [])
-
-            payload["ingest_errors"].append(
-                f"Pathsafe assembly pipeline failed in process {process} with exit code {trace['exit']} and status {trace['status']}"
+            add_ingest_error(
+                payload,
+                f"Pathsafe assembly pipeline failed in process {process} with exit code {trace['exit']} and status {trace['status']}",
             )
             ingest_fail = True
             payload["rerun"] = True
@@ -488,6 +640,26 @@ def ret_0_parser(
     return (ingest_fail, payload)
 
 
+# A gzip stream wrapping no reads is only a few tens of bytes, objects bigger than this can't be empty
+EMPTY_GZIP_MAX_SIZE = 1024
+
+
+def gzip_bytes_empty(data: bytes) -> bool:
+    """Check whether a (small) gzipped object decompresses to nothing
+
+    Args:
+        data (bytes): Raw gzipped bytes
+
+    Returns:
+        bool: True if the data decompresses to zero bytes, False otherwise (including if it isn't valid gzip, the pipeline will report that)
+    """
+    try:
+        return not gzip.decompress(data)
+
+    except (OSError, EOFError, zlib.error):
+        return False
+
+
 def ensure_files_not_empty(
     log: logging.getLogger, payload: dict, s3_client: boto3.client
 ) -> tuple[bool, dict]:
@@ -503,13 +675,21 @@ def ensure_files_not_empty(
                 Key=file["key"],
             )
 
-            if response["ContentLength"] == 0:
+            empty = response["ContentLength"] == 0
+
+            # Compressed empty files aren't 0 bytes, so look inside anything small enough to be one
+            if not empty and response["ContentLength"] <= EMPTY_GZIP_MAX_SIZE:
+                empty = gzip_bytes_empty(
+                    s3_client.get_object(Bucket=bucket, Key=file["key"])["Body"].read()
+                )
+
+            if empty:
                 log.error(
                     f"FASTQ file for UUID: {payload['uuid']} is empty, sending result"
                 )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    "At least one FASTQ file appears to be empty. Please contact the pathsafe admin team if you believe this to be in error."
+                add_ingest_error(
+                    payload,
+                    "At least one FASTQ file appears to be empty. Please contact the pathsafe admin team if you believe this to be in error.",
                 )
                 fail = True
 
@@ -518,19 +698,16 @@ def ensure_files_not_empty(
                 log.error(
                     f"FASTQ file for UUID: {payload['uuid']} not found in S3, sending result"
                 )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    "At least one FASTQ file appears to have been removed from S3 post upload. Please contact the pathsafe admin team if you believe this to be in error."
+                add_ingest_error(
+                    payload,
+                    "At least one FASTQ file appears to have been removed from S3 post upload. Please contact the pathsafe admin team if you believe this to be in error.",
                 )
                 fail = True
             else:
                 log.error(
                     f"Failed to check if fastq file for UUID: {payload['uuid']} is empty due to client error: {e}"
                 )
-                payload.setdefault("ingest_errors", [])
-                payload["ingest_errors"].append(
-                    "Failed to check if fastq file isn't empty"
-                )
+                add_ingest_error(payload, "Failed to check if fastq file isn't empty")
                 fail = True
                 payload["rerun"] = True
 
@@ -542,20 +719,14 @@ def validate(
     args: argparse.Namespace,
     ingest_pipe: pipeline,
 ):
-    s3_credentials = get_s3_credentials()
-
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=s3_credentials.access_key,
-        aws_secret_access_key=s3_credentials.secret_key,
-        endpoint_url=s3_credentials.endpoint,
-    )
+    s3_client = get_s3_client()
 
     log = logging.getLogger("pathsafe.validate")
 
-    to_validate = json.loads(message.body)
+    to_validate = orjson.loads(message.body)
 
-    payload = copy.deepcopy(to_validate)
+    # A second parse of the (small) message body is much cheaper than deep-copying the parsed dict
+    payload = orjson.loads(message.body)
 
     payload["rerun"] = False
 
@@ -588,9 +759,9 @@ def validate(
 
     except EtagMismatchError:
         log.error(f"ETag mismatch for UUID: {payload['uuid']}")
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "CSV file appears to have been modified during validation, this is likely due to a resubmission which will be processed later."
+        add_ingest_error(
+            payload,
+            "CSV file appears to have been modified during validation, this is likely due to a resubmission which will be processed later.",
         )
         return (False, payload, message)
 
@@ -598,8 +769,7 @@ def validate(
         log.error(
             f"Could not open CSV file for UUID: {payload['uuid']} due to error: {e}"
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append("Could not open CSV file")
+        add_ingest_error(payload, "Could not open CSV file")
         payload["rerun"] = True
         time.sleep(args.retry_delay)
         return (False, payload, message)
@@ -612,27 +782,11 @@ def validate(
         log.error(f"FASTQ file for UUID: {payload['uuid']} is empty, sending result")
         return (False, payload, message)
 
-    unseen_check_fail, fastq_1_unseen, alert, payload = ensure_file_unseen(
-        etag_field="fastq_1_etag",
-        etag=to_validate["files"][".1.fastq.gz"]["etag"],
-        log=log,
-        payload=payload,
-    )
-
-    if unseen_check_fail:
-        log.error(
-            f"Failed to check if fastq file for UUID: {payload['uuid']} has already been ingested into the {payload['project']} project, sending result"
-        )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "Failed to check if fastq file has already been ingested into the project"
-        )
-        payload["rerun"] = True
-        return (False, payload, message)
-
-    unseen_check_fail, fastq_2_unseen, alert, payload = ensure_file_unseen(
-        etag_field="fastq_2_etag",
-        etag=to_validate["files"][".2.fastq.gz"]["etag"],
+    unseen_check_fail, fastqs_unseen, alert, payload = ensure_files_unseen(
+        etags={
+            "fastq_1_etag": to_validate["files"][".1.fastq.gz"]["etag"],
+            "fastq_2_etag": to_validate["files"][".2.fastq.gz"]["etag"],
+        },
         log=log,
         payload=payload,
     )
@@ -641,20 +795,20 @@ def validate(
         log.error(
             f"Failed to check if fastq file for UUID: {payload['uuid']} has already been ingested into the {payload['project']} project, sending result"
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "Failed to check if fastq file has already been ingested into the project"
+        add_ingest_error(
+            payload,
+            "Failed to check if fastq file has already been ingested into the project",
         )
         payload["rerun"] = True
         return (False, payload, message)
 
-    if not fastq_1_unseen or not fastq_2_unseen:
+    if not all(fastqs_unseen.values()):
         log.info(
             f"Fastq file for UUID: {payload['uuid']} has already been ingested into the {payload['project']} project, skipping validation"
         )
-        payload.setdefault("ingest_errors", [])
-        payload["ingest_errors"].append(
-            "At least one submitted fastq file appears identical to a previously ingested file, please ensure that the submission is not a duplicate. Please contact the pathsafe admin team if you believe this to be in error."
+        add_ingest_error(
+            payload,
+            "At least one submitted fastq file appears identical to a previously ingested file, please ensure that the submission is not a duplicate. Please contact the pathsafe admin team if you believe this to be in error.",
         )
         return (False, payload, message)
 
@@ -791,22 +945,36 @@ def run(args):
     )
 
     worker_pool = worker_pool_handler(
-        workers=args.n_workers, logger=log, varys_client=varys_client
+        workers=args.n_workers,
+        logger=log,
+        varys_client=varys_client,
+        args=args,
+        ingest_pipe=ingest_pipe,
     )
     try:
         while True:
-            time.sleep(0.5)
+            # Blocks until a delivery arrives, with up to two per worker held in the prefetch window
             message = varys_client.receive(
                 exchange="inbound-to_validate-pathsafe",
                 queue_suffix="validator",
-                prefetch_count=args.n_workers,
+                prefetch_count=args.n_workers * 2,
             )
 
-            worker_pool.submit_job(message=message, args=args, ingest_pipe=ingest_pipe)
+            # Drain anything else already delivered under the prefetch window so it is dispatched together
+            batch = [
+                message,
+                *varys_client.receive_batch(
+                    exchange="inbound-to_validate-pathsafe",
+                    queue_suffix="validator",
+                    timeout=0,
+                ),
+            ]
+
+            worker_pool.submit_job_batch(messages=batch)
     except BaseException as e:
         log.info(f"Shutting down worker pool due to exception: {e}")
         os.remove("/tmp/healthy")
-        worker_pool.close()
+        worker_pool.close(timeout=args.shutdown_timeout)
         varys_client.close()
         time.sleep(1)
         sys.exit(1)
@@ -846,6 +1014,12 @@ def main():
         default=180,
         help="Time to wait before re-queuing a failed message",
     )
+    parser.add_argument(
+        "--shutdown_timeout",
+        type=int,
+        default=60,
+        help="Seconds to wait for in-flight jobs on shutdown before terminating the workers",
+    )
     args = parser.parse_args()
 
     run(args)
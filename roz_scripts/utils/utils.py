@@ -1,17 +1,25 @@
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import atexit
 import configparser
+import functools
 import os
 import sys
-from io import StringIO
+import threading
+from io import TextIOWrapper
 import logging
 import logging.handlers
 from pathlib import Path
 import time
 import csv
 import regex as re
-import json
+import mmap
+import multiprocessing as mp
+import orjson
 import random
 
 from onyx import (
@@ -239,7 +247,7 @@ class pipeline:
         return returncode
 
 
-def init_logger(name, log_path, log_level):
+def init_logger(name, log_path, log_level, non_blocking=False):
     log = logging.getLogger(name)
     log.propagate = False
     log.setLevel(log_level)
@@ -248,10 +256,46 @@ def init_logger(name, log_path, log_level):
         logging_fh.setFormatter(
             logging.Formatter("%(name)s\t::%(levelname)s::%(asctime)s::\t%(message)s")
         )
-        log.addHandler(logging_fh)
+        if non_blocking:
+            # Records are handed to a listener thread that does the file writes, the queue is a multiprocessing
+            # one so forked worker processes log through the same listener rather than racing on the file
+            log_queue = mp.Queue(-1)
+            listener = logging.handlers.QueueListener(
+                log_queue, logging_fh, respect_handler_level=True
+            )
+            listener.start()
+            atexit.register(listener.stop)
+            log.addHandler(logging.handlers.QueueHandler(log_queue))
+        else:
+            log.addHandler(logging_fh)
     return log
 
 
+def add_onyx_errors(payload: dict, key: str, response) -> None:
+    """
+    Merge the per-field error messages from an Onyx error response into payload[key], the response body is only parsed once
+
+    Args:
+        payload (dict): Payload dict to add the errors to
+        key (str): Payload key to collect the errors under e.g. "onyx_errors"
+        response (requests.Response): Onyx error response with a "messages" dict of field -> list of messages
+    """
+    errors = payload.setdefault(key, {})
+
+    for field, messages in response.json()["messages"].items():
+        errors.setdefault(field, []).extend(messages)
+
+
+def add_ingest_error(payload: dict, error: str) -> None:
+    """Append a user-facing error message to the payload's ingest_errors list, creating it if needed
+
+    Args:
+        payload (dict): Payload dict for the current artifact
+        error (str): Error message to add
+    """
+    payload.setdefault("ingest_errors", []).append(error)
+
+
 def put_result_json(payload: dict, log: logging.getLogger):
     """Send the result payload to S3
 
@@ -260,21 +304,13 @@ def put_result_json(payload: dict, log: logging.getLogger):
         log (logging.getLogger): Logger object
     """
 
-    s3_credentials = get_s3_credentials()
-
-    s3_client = boto3.client(
-        "s3",
-        endpoint_url=s3_credentials.endpoint,
-        aws_access_key_id=s3_credentials.access_key,
-        region_name=s3_credentials.region,
-        aws_secret_access_key=s3_credentials.secret_key,
-    )
+    s3_client = get_s3_client()
 
     try:
         s3_client.put_object(
             Bucket=f"{payload['project']}-{payload['raw_site']}-results",
             Key=f"{payload['project']}.{payload['run_index']}.{payload['run_id']}.result.json",
-            Body=json.dumps(payload),
+            Body=orjson.dumps(payload),
         )
 
         log.info(
@@ -294,15 +330,7 @@ def put_linkage_json(payload: dict, log: logging.getLogger):
         log (logging.getLogger): Logger object
     """
 
-    s3_credentials = get_s3_credentials()
-
-    s3_client = boto3.client(
-        "s3",
-        endpoint_url=s3_credentials.endpoint,
-        aws_access_key_id=s3_credentials.access_key,
-        region_name=s3_credentials.region,
-        aws_secret_access_key=s3_credentials.secret_key,
-    )
+    s3_client = get_s3_client()
 
     linkage_dict = {
         "publish_timestamp": time.time_ns(),
@@ -324,7 +352,7 @@ def put_linkage_json(payload: dict, log: logging.getLogger):
         s3_client.put_object(
             Bucket=f"{payload['project']}-{payload['raw_site']}-results",
             Key=f"{payload['project']}.{payload['run_index']}.{payload['run_id']}.linkage.json",
-            Body=json.dumps(linkage_dict),
+            Body=orjson.dumps(linkage_dict),
         )
         log.info(
             f"Successfully uploaded linkage JSON for artifact: {payload['artifact']} to S3"
@@ -353,27 +381,29 @@ def csv_create(
     # Not sure how to fully generalise this, the idea is to have a csv as the only file that will always exist, so I guess this is okay?
     # CSV file must always be called '.csv' though
 
-    onyx_config = get_onyx_credentials()
+    # Test and real creates report their errors under different payload keys
+    errors_key = "onyx_test_create_errors" if test_submission else "onyx_create_errors"
 
-    with OnyxClient(config=onyx_config) as client:
+    with get_onyx_client() as client:
         reconnect_count = 0
         while reconnect_count <= 3:
             try:
                 # Test create from the metadata CSV
-                response = client.csv_create(
-                    payload["project"],
-                    csv_file=s3_to_fh(
-                        payload["files"][".csv"]["uri"],
-                        payload["files"][".csv"]["etag"],
-                    ),  # I don't like having a hardcoded metadata file name like this but hypothetically we should always have a metadata CSV
-                    test=test_submission,
-                    fields={
-                        "site": payload["site"],
-                        "platform": payload["platform"],
-                        "is_published": False,
-                    },
-                    multiline=False,
-                )
+                with s3_to_fh(
+                    payload["files"][".csv"]["uri"],
+                    payload["files"][".csv"]["etag"],
+                ) as csv_fh:  # I don't like having a hardcoded metadata file name like this but hypothetically we should always have a metadata CSV
+                    response = client.csv_create(
+                        payload["project"],
+                        csv_file=csv_fh,
+                        test=test_submission,
+                        fields={
+                            "site": payload["site"],
+                            "platform": payload["platform"],
+                            "is_published": False,
+                        },
+                        multiline=False,
+                    )
 
                 if not test_submission:
                     payload["climb_id"] = response["climb_id"]
@@ -400,35 +430,20 @@ def csv_create(
                     log.error(
                         f"Failed to connect to Onyx {reconnect_count} times with error: {e}"
                     )
-                    if test_submission:
-                        payload.setdefault("onyx_test_create_errors", {})
-                        payload["onyx_test_create_errors"].setdefault("onyx_errors", [])
-                        payload["onyx_test_create_errors"]["onyx_errors"].append(
-                            f"Failed to connect to Onyx {reconnect_count} times with error: {e}"
-                        )
-                    else:
-                        payload.setdefault("onyx_create_errors", {})
-                        payload["onyx_create_errors"].setdefault("onyx_errors", [])
-                        payload["onyx_create_errors"]["onyx_errors"].append(
-                            f"Failed to connect to Onyx {reconnect_count} times with error: {e}"
-                        )
+                    payload.setdefault(errors_key, {}).setdefault(
+                        "onyx_errors", []
+                    ).append(
+                        f"Failed to connect to Onyx {reconnect_count} times with error: {e}"
+                    )
 
                     return (False, True, payload)
 
             except (OnyxServerError, OnyxConfigError) as e:
                 log.error(f"Unhandled csv_create Onyx error: {e}")
-                if test_submission:
-                    payload.setdefault("onyx_test_create_errors", {})
-                    payload["onyx_test_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_test_create_errors"]["onyx_errors"].append(
-                        f"Unhandled csv_create Onyx error: {e}"
-                    )
-                else:
-                    payload.setdefault("onyx_create_errors", {})
-                    payload["onyx_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_create_errors"]["onyx_errors"].append(
-                        f"Unhandled csv_create Onyx error: {e}"
-                    )
+                payload.setdefault(errors_key, {}).setdefault("onyx_errors", []).append(
+                    f"Unhandled csv_create Onyx error: {e}"
+                )
+                if not test_submission:
                     payload["rerun"] = True
 
                 return (False, True, payload)
@@ -438,14 +453,9 @@ def csv_create(
                     f"Onyx csv create failed for artifact: {payload['artifact']}, UUID: {payload['uuid']}"
                 )
 
-                if test_submission:
-                    payload.setdefault("onyx_test_create_errors", {})
-                    payload["onyx_test_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_test_create_errors"]["onyx_errors"].append(str(e))
-                else:
-                    payload.setdefault("onyx_create_errors", {})
-                    payload["onyx_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_create_errors"]["onyx_errors"].append(str(e))
+                payload.setdefault(errors_key, {}).setdefault("onyx_errors", []).append(
+                    str(e)
+                )
 
                 return (False, False, payload)
 
@@ -456,10 +466,7 @@ def csv_create(
 
                 if test_submission:
                     # Handle the case where the record already exists but isn't published when field is added to onyx
-                    payload.setdefault("onyx_test_create_errors", {})
-                    for field, messages in e.response.json()["messages"].items():
-                        payload["onyx_test_create_errors"].setdefault(field, [])
-                        payload["onyx_test_create_errors"][field].extend(messages)
+                    add_onyx_errors(payload, "onyx_test_create_errors", e.response)
 
                     return (False, False, payload)
 
@@ -472,10 +479,7 @@ def csv_create(
                         return (False, True, payload)
 
                     if artifact_published:
-                        payload.setdefault("onyx_create_errors", {})
-                        for field, messages in e.response.json()["messages"].items():
-                            payload["onyx_create_errors"].setdefault(field, [])
-                            payload["onyx_create_errors"][field].extend(messages)
+                        add_onyx_errors(payload, "onyx_create_errors", e.response)
 
                         return (False, alert, payload)
 
@@ -486,52 +490,24 @@ def csv_create(
                     f"CSV appears to have been modified after upload for artifact: {payload['artifact']}"
                 )
 
-                if test_submission:
-                    payload.setdefault("onyx_test_create_errors", {})
-                    payload["onyx_test_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_test_create_errors"]["onyx_errors"].append(
-                        f"CSV appears to have been modified after upload for artifact: {payload['artifact']}"
-                    )
-                else:
-                    payload.setdefault("onyx_create_errors", {})
-                    payload["onyx_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_create_errors"]["onyx_errors"].append(
-                        f"CSV appears to have been modified after upload for artifact: {payload['artifact']}"
-                    )
+                payload.setdefault(errors_key, {}).setdefault("onyx_errors", []).append(
+                    f"CSV appears to have been modified after upload for artifact: {payload['artifact']}"
+                )
 
                 return (False, False, payload)
 
             except Exception as e:
-                if test_submission:
-                    log.error(f"Unhandled csv_create error: {e}")
-                    payload.setdefault("onyx_test_create_errors", {})
-                    payload["onyx_test_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_test_create_errors"]["onyx_errors"].append(
-                        f"Unhandled csv_create error: {e}"
-                    )
-                else:
-                    log.error(f"Unhandled csv_create error: {e}")
-                    payload.setdefault("onyx_create_errors", {})
-                    payload["onyx_create_errors"].setdefault("onyx_errors", [])
-                    payload["onyx_create_errors"]["onyx_errors"].append(
-                        f"Unhandled csv_create error: {e}"
-                    )
+                log.error(f"Unhandled csv_create error: {e}")
+                payload.setdefault(errors_key, {}).setdefault("onyx_errors", []).append(
+                    f"Unhandled csv_create error: {e}"
+                )
 
                 return (False, True, payload)
 
         # This should never be reached
-        if test_submission:
-            payload.setdefault("onyx_test_create_errors", {})
-            payload["onyx_test_create_errors"].setdefault("onyx_errors", [])
-            payload["onyx_test_create_errors"]["onyx_errors"].append(
-                "End of csv_create func reached, this should never happen!"
-            )
-        else:
-            payload.setdefault("onyx_create_errors", {})
-            payload["onyx_create_errors"].setdefault("onyx_errors", [])
-            payload["onyx_create_errors"]["onyx_errors"].append(
-                "End of csv_create func reached, this should never happen!"
-            )
+        payload.setdefault(errors_key, {}).setdefault("onyx_errors", []).append(
+            "End of csv_create func reached, this should never happen!"
+        )
 
         return (False, True, payload)
 
@@ -635,9 +611,7 @@ def onyx_identify(payload: dict, identity_field: str, log: logging.getLogger):
         )
         return (False, True, payload)
 
-    onyx_config = get_onyx_credentials()
-
-    with OnyxClient(config=onyx_config) as client:
+    with get_onyx_client() as client:
         reconnect_count = 0
         while reconnect_count <= 3:
             try:
@@ -734,7 +708,7 @@ def onyx_reconcile(
         f"Successfully identified {identifier} for artifact: {payload['artifact']}"
     )
 
-    with OnyxClient(config=get_onyx_credentials()) as client:
+    with get_onyx_client() as client:
         reconnect_count = 0
         while reconnect_count <= 3:
             try:
@@ -835,10 +809,7 @@ def onyx_reconcile(
                 log.error(
                     f"Onyx reconcile failed for artifact: {payload['artifact']}, UUID: {payload['uuid']}. Error: {e}"
                 )
-                payload.setdefault("onyx_errors", {})
-                for field, messages in e.response.json()["messages"].items():
-                    payload["onyx_errors"].setdefault(field, [])
-                    payload["onyx_errors"][field].extend(messages)
+                add_onyx_errors(payload, "onyx_errors", e.response)
                 return (False, True, payload)
 
             except Exception as e:
@@ -873,9 +844,7 @@ def ensure_file_unseen(
     Returns:
         tuple[bool, bool, bool, dict]: Tuple containing a bool indicating whether the check failed, a bool indicating whether the file is unseen or not,  a bool indicating whether to squawk in the alerts channel, and the updated payload dict
     """
-    onyx_config = get_onyx_credentials()
-
-    with OnyxClient(config=onyx_config) as client:
+    with get_onyx_client() as client:
         reconnect_count = 0
         while reconnect_count <= 3:
             try:
@@ -930,10 +899,7 @@ def ensure_file_unseen(
                 log.error(
                     f"Onyx filter failed for artifact: {payload['artifact']}, UUID: {payload['uuid']}. Error: {e}"
                 )
-                payload.setdefault("onyx_errors", {})
-                for field, messages in e.response.json()["messages"].items():
-                    payload["onyx_errors"].setdefault(field, [])
-                    payload["onyx_errors"][field].extend(messages)
+                add_onyx_errors(payload, "onyx_errors", e.response)
                 return (True, True, True, payload)
 
             except Exception as e:
@@ -946,6 +912,48 @@ def ensure_file_unseen(
                 return (True, True, True, payload)
 
 
+def ensure_files_unseen(
+    etags: dict, log: logging.getLogger, payload: dict
+) -> tuple[bool, dict, bool, dict]:
+    """Function to check that several files have not already been uploaded to Onyx, the checks are independent
+    so they are run concurrently
+
+    Args:
+        etags (dict): Dict of {etag_field: etag} to check
+        log (logging.getLogger): Logger object
+        payload (dict): Payload dict for the current artifact
+
+    Returns:
+        tuple[bool, dict, bool, dict]: Tuple containing a bool indicating whether any check failed, a dict of {etag_field: bool} indicating whether each file is unseen, a bool indicating whether to squawk in the alerts channel, and the updated payload dict
+    """
+
+    with ThreadPoolExecutor(max_workers=len(etags)) as executor:
+        unseen_futures = {
+            etag_field: executor.submit(
+                ensure_file_unseen,
+                etag_field=etag_field,
+                etag=etag,
+                log=log,
+                payload=payload,
+            )
+            for etag_field, etag in etags.items()
+        }
+
+    check_fail = False
+    unseen = {}
+    alert = False
+
+    for etag_field, unseen_future in unseen_futures.items():
+        field_check_fail, unseen[etag_field], field_alert, payload = (
+            unseen_future.result()
+        )
+
+        check_fail = check_fail or field_check_fail
+        alert = alert or field_alert
+
+    return (check_fail, unseen, alert, payload)
+
+
 def check_artifact_published(
     payload: dict, log: logging.getLogger
 ) -> tuple[bool, bool, dict]:
@@ -963,7 +971,7 @@ def check_artifact_published(
     if not run_success:
         return (False, run_alert, payload)
 
-    with OnyxClient(config=get_onyx_credentials()) as client:
+    with get_onyx_client() as client:
         reconnect_count = 0
         while reconnect_count <= 3:
             try:
@@ -1034,10 +1042,7 @@ def check_artifact_published(
                 log.error(
                     f"Onyx filter failed for artifact: {payload['artifact']}, UUID: {payload['uuid']}. Error: {e}"
                 )
-                payload.setdefault("onyx_errors", {})
-                for field, messages in e.response.json()["messages"].items():
-                    payload["onyx_errors"].setdefault(field, [])
-                    payload["onyx_errors"][field].extend(messages)
+                add_onyx_errors(payload, "onyx_errors", e.response)
                 return (False, True, payload)
 
             except Exception as e:
@@ -1065,9 +1070,7 @@ def onyx_update(
         tuple[bool, bool, dict]: Tuple containing a bool indicating whether the update failed, a bool indicating whether to squawk in the alerts channel, and the updated payload dict
     """
 
-    onyx_config = get_onyx_credentials()
-
-    with OnyxClient(config=onyx_config) as client:
+    with get_onyx_client() as client:
         reconnect_count = 0
         while reconnect_count <= 3:
             try:
@@ -1122,10 +1125,7 @@ def onyx_update(
                     f"Onyx update failed for artifact: {payload['artifact']}, UUID: {payload['uuid']}. Error: {e}"
                 )
 
-                payload.setdefault("onyx_update_errors", {})
-                for field, messages in e.response.json()["messages"].items():
-                    payload["onyx_update_errors"].setdefault(field, [])
-                    payload["onyx_update_errors"][field].extend(messages)
+                add_onyx_errors(payload, "onyx_update_errors", e.response)
 
                 return (True, False, payload)
 
@@ -1147,7 +1147,9 @@ def onyx_update(
     return (True, True, payload)
 
 
+@functools.lru_cache(maxsize=1)
 def get_onyx_credentials():
+    # The Onyx domain / token are fixed for the lifetime of the process so only build the config once
     config = OnyxConfig(
         domain=os.environ["ONYX_DOMAIN"],
         token=os.environ["ONYX_TOKEN"],
@@ -1155,6 +1157,65 @@ def get_onyx_credentials():
     return config
 
 
+class _PersistentOnyxSession:
+    """
+    Context manager around an OnyxClient which only enters the client (opening its requests session) the first
+    time it is used, so the session and its pooled connections are kept open between `with` blocks until close()
+    """
+
+    def __init__(self, client: OnyxClient):
+        self._client = client
+        self._entered = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> OnyxClient:
+        if self._entered is None:
+            with self._lock:
+                if self._entered is None:
+                    self._entered = self._client.__enter__()
+
+        return self._entered
+
+    def __exit__(self, type, value, traceback):
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._entered is not None:
+                self._client.__exit__(None, None, None)
+                self._entered = None
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_onyx_session(pid: int) -> _PersistentOnyxSession:
+    onyx_session = _PersistentOnyxSession(OnyxClient(config=get_onyx_credentials()))
+    atexit.register(onyx_session.close)
+    return onyx_session
+
+
+def get_onyx_client() -> _PersistentOnyxSession:
+    """
+    Get an Onyx client with a persistent session. One client is kept per process and shared between its threads
+    (the session's connection pool is thread safe), so short lived executor threads reuse it too. The cache is keyed
+    on the PID as the session should not be shared across a fork, and the session is closed at exit.
+
+    Returns:
+        _PersistentOnyxSession: Context manager yielding the Onyx client, use it in a `with` block
+    """
+    return _cached_onyx_session(os.getpid())
+
+
+def reset_onyx_client() -> None:
+    """
+    Close and drop this process's cached Onyx client so the next get_onyx_client() call builds a new one,
+    e.g. after OnyxClient has been patched in tests
+    """
+    if _cached_onyx_session.cache_info().currsize:
+        _cached_onyx_session(os.getpid()).close()
+
+    _cached_onyx_session.cache_clear()
+
+
 def get_s3_credentials(
     args=None,
 ) -> __s3_creds:
@@ -1225,38 +1286,252 @@ def get_s3_credentials(
     return s3_credentials
 
 
-def s3_to_fh(s3_uri: str, eTag: str) -> StringIO:
+def load_json_file(path: str):
     """
-    Take file from S3 URI and return a file handle-like object using StringIO
-    Requires an S3 URI and an ETag to confirm the file has not been modified since upload.
+    Load a JSON file by memory mapping it and parsing the mapped bytes directly with orjson, this avoids
+    reading the (potentially very large) file into an intermediate Python string first.
 
     Args:
-        s3_uri (str): S3 URI of the file to be downloaded
-        eTag (str): ETag of the file to be downloaded
+        path (str): Path to the JSON file
 
     Returns:
-        StringIO: File handle-like object of the downloaded file
+        The parsed JSON object
     """
 
-    s3_credentials = get_s3_credentials()
+    with open(path, "rb") as json_fh:
+        with mmap.mmap(json_fh.fileno(), 0, access=mmap.ACCESS_READ) as json_mm:
+            with memoryview(json_mm) as json_view:
+                return orjson.loads(json_view)
 
-    bucket = s3_uri.replace("s3://", "").split("/")[0]
 
-    key = s3_uri.replace("s3://", "").split("/", 1)[1]
+@functools.lru_cache(maxsize=1)
+def _cached_boto3_session(pid: int) -> boto3.session.Session:
+    return boto3.session.Session()
+
 
-    s3_client = boto3.client(
+@functools.lru_cache(maxsize=1)
+def _cached_s3_client(pid: int) -> boto3.client:
+    s3_credentials = get_s3_credentials()
+
+    return _cached_boto3_session(pid).client(
         "s3",
         endpoint_url=s3_credentials.endpoint,
         aws_access_key_id=s3_credentials.access_key,
         region_name=s3_credentials.region,
         aws_secret_access_key=s3_credentials.secret_key,
+        config=Config(
+            max_pool_connections=64,
+            retries={"max_attempts": 10, "mode": "adaptive"},
+            tcp_keepalive=True,
+        ),
+    )
+
+
+def get_s3_client() -> boto3.client:
+    """
+    Get an S3 client using the credentials from get_s3_credentials(). The client is only constructed once per process
+    and then reused so that its connection pool is kept warm between calls. The cache is keyed on the PID as boto3
+    clients should not be shared across a fork.
+
+    Returns:
+        boto3.client: Boto3 client object for S3
+    """
+
+    return _cached_s3_client(os.getpid())
+
+
+def ensure_buckets_reachable(
+    s3_client: boto3.client, buckets: list, log: logging.getLogger
+) -> bool:
+    """
+    Check that every bucket in a list exists and is accessible with the current credentials, so that
+    a misconfigured deployment fails at startup rather than after a full pipeline run
+
+    Args:
+        s3_client (boto3.client): Boto3 client object for S3
+        buckets (list): List of bucket names to check
+        log (logging.getLogger): Logger object
+
+    Returns:
+        bool: True if every bucket is reachable, False otherwise
+    """
+    reachable = True
+
+    for bucket in buckets:
+        try:
+            s3_client.head_bucket(Bucket=bucket)
+
+        except ClientError as head_bucket_exception:
+            log.error(
+                f"Could not reach S3 bucket: {bucket} due to client error: {head_bucket_exception}"
+            )
+            reachable = False
+
+    return reachable
+
+
+UPLOAD_BUFFER_SIZE = 32 * 1024 * 1024
+
+# Per-process upload concurrency budget, the most S3 connections one process's uploads may hold open at once.
+# It is shared between UPLOAD_SLOTS files in flight and the multipart threads of each of those files, callers
+# running uploads in parallel must stay within it. It is kept well below the S3 client's max_pool_connections
+# so uploads never queue on the connection pool.
+UPLOAD_CONCURRENCY_BUDGET = 16
+
+# Number of files a single process uploads at once
+UPLOAD_SLOTS = 4
+
+DEFAULT_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=64 * 1024 * 1024,
+    max_concurrency=UPLOAD_CONCURRENCY_BUDGET // UPLOAD_SLOTS,
+    use_threads=True,
+)
+
+
+def get_transfer_config(content_length: int = 0) -> TransferConfig:
+    """
+    Build an S3 TransferConfig scaled to the expected size of an upload so that large files are
+    split into ~8 multipart chunks rather than hundreds of small ones. The per-file thread count is
+    the process's UPLOAD_CONCURRENCY_BUDGET split between its UPLOAD_SLOTS concurrent uploads.
+
+    Args:
+        content_length (int, optional): Expected size of the upload in bytes. Defaults to 0.
+
+    Returns:
+        TransferConfig: TransferConfig object to pass to upload_local_file
+    """
+    part_size = max(DEFAULT_TRANSFER_CONFIG.multipart_chunksize, content_length // 8)
+
+    return TransferConfig(
+        multipart_threshold=DEFAULT_TRANSFER_CONFIG.multipart_threshold,
+        multipart_chunksize=part_size,
+        max_concurrency=DEFAULT_TRANSFER_CONFIG.max_concurrency,
+        use_threads=True,
     )
 
+
+@functools.lru_cache(maxsize=1)
+def _upload_slots(pid: int) -> threading.BoundedSemaphore:
+    return threading.BoundedSemaphore(UPLOAD_SLOTS)
+
+
+@functools.lru_cache(maxsize=1)
+def _upload_executor(pid: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=UPLOAD_SLOTS, thread_name_prefix="s3-upload")
+
+
+def upload_stream(
+    s3_client: boto3.client,
+    fileobj,
+    bucket: str,
+    key: str,
+    transfer_config: TransferConfig = None,
+) -> None:
+    """
+    Upload a readable file object to S3 once one of the process's UPLOAD_SLOTS is free. Every upload goes through
+    here so however many threads are publishing at once the process stays within UPLOAD_CONCURRENCY_BUDGET.
+    The slots are keyed on the PID so a forked worker gets its own.
+
+    Args:
+        s3_client (boto3.client): Boto3 client object for S3
+        fileobj: Readable binary file object to upload
+        bucket (str): Destination bucket
+        key (str): Destination key
+        transfer_config (TransferConfig, optional): TransferConfig to use for the upload. Defaults to DEFAULT_TRANSFER_CONFIG.
+    """
+
+    with _upload_slots(os.getpid()):
+        s3_client.upload_fileobj(
+            fileobj,
+            bucket,
+            key,
+            Config=transfer_config or DEFAULT_TRANSFER_CONFIG,
+        )
+
+
+def upload_local_file(
+    s3_client: boto3.client,
+    path: str,
+    bucket: str,
+    key: str,
+    transfer_config: TransferConfig = None,
+) -> None:
+    """
+    Stream a local file to S3 through a large read buffer, multipart chunks are then read in a handful of
+    syscalls rather than many small ones
+
+    Args:
+        s3_client (boto3.client): Boto3 client object for S3
+        path (str): Path to the local file
+        bucket (str): Destination bucket
+        key (str): Destination key
+        transfer_config (TransferConfig, optional): TransferConfig to use for the upload. Defaults to DEFAULT_TRANSFER_CONFIG.
+    """
+
+    with open(path, "rb", buffering=UPLOAD_BUFFER_SIZE) as upload_fh:
+        upload_stream(s3_client, upload_fh, bucket, key, transfer_config)
+
+
+def upload_files(
+    s3_client: boto3.client,
+    uploads: list,
+    transfer_config: TransferConfig = None,
+) -> list:
+    """
+    Upload a set of local files to S3 concurrently on the process's shared upload executor, which has one thread
+    per upload slot so concurrent callers don't each start their own pool. boto3 clients are thread safe so every
+    upload shares the one client (and its connection pool). This must not be called from an upload thread.
+
+    Args:
+        s3_client (boto3.client): Boto3 client object for S3
+        uploads (list): List of (local path, bucket, key) tuples to upload
+        transfer_config (TransferConfig, optional): TransferConfig to use for each upload. Defaults to DEFAULT_TRANSFER_CONFIG.
+
+    Returns:
+        list: The exception raised by each upload, or None if it succeeded, in the same order as uploads
+    """
+
+    executor = _upload_executor(os.getpid())
+
+    upload_futures = [
+        executor.submit(
+            upload_local_file, s3_client, path, bucket, key, transfer_config
+        )
+        for path, bucket, key in uploads
+    ]
+
+    return [future.exception() for future in upload_futures]
+
+
+def s3_to_fh(s3_uri: str, eTag: str) -> TextIOWrapper:
+    """
+    Take file from S3 URI and return a text file handle streaming the object body
+    Requires an S3 URI and an ETag to confirm the file has not been modified since upload.
+    The body is decoded as it is read rather than buffered up front, so the handle
+    should be closed (or used as a context manager) to release the connection.
+
+    Args:
+        s3_uri (str): S3 URI of the file to be downloaded
+        eTag (str): ETag of the file to be downloaded
+
+    Returns:
+        TextIOWrapper: Text file handle over the object body
+    """
+
+    bucket = s3_uri.replace("s3://", "").split("/")[0]
+
+    key = s3_uri.replace("s3://", "").split("/", 1)[1]
+
+    s3_client = get_s3_client()
+
     file_obj = s3_client.get_object(Bucket=bucket, Key=key)
 
     if file_obj["ETag"].replace('"', "") != eTag:
+        # The body is never handed to the caller, so release its connection here
+        file_obj["Body"].close()
         raise EtagMismatchError(
             "ETag mismatch, CSV appears to have been modified between upload and parsing"
         )
 
-    return StringIO(file_obj["Body"].read().decode("utf-8-sig"))
+    return TextIOWrapper(file_obj["Body"], encoding="utf-8-sig")
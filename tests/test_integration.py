@@ -22,6 +22,8 @@ import boto3
 import uuid
 import pika
 import copy
+import io
+import tarfile
 
 DIR = os.path.dirname(__file__)
 S3_MATCHER_LOG_FILENAME = os.path.join(DIR, "s3_matcher.log")
@@ -739,6 +741,9 @@ class Test_S3_matcher(unittest.TestCase):
 
 class Test_ingest(unittest.TestCase):
     def setUp(self):
+        # OnyxClient is patched per test, so drop any client cached by an earlier one
+        utils.reset_onyx_client()
+
         self.server = ThreadedMotoServer()
         self.server.start()
 
@@ -874,6 +879,9 @@ class Test_ingest(unittest.TestCase):
 
 class Test_mscape_validator(unittest.TestCase):
     def setUp(self):
+        # OnyxClient is patched per test, so drop any client cached by an earlier one
+        utils.reset_onyx_client()
+
         self.server = ThreadedMotoServer()
         self.server.start()
 
@@ -1135,6 +1143,226 @@ class Test_mscape_validator(unittest.TestCase):
                 n_workers=2,
                 retry_delay=2,
                 project="mscape",
+                tar_read_fractions=False,
+            )
+
+            pipeline = utils.pipeline(
+                pipe="test",
+                nxf_executable="test",
+                config="test",
+            )
+
+            test_message = copy.deepcopy(example_validator_message)
+
+            in_message = SimpleNamespace(body=json.dumps(test_message))
+
+            Success, alert, hcid_alerts, payload, message = (
+                mscape_ingest_validation.validate(in_message, args, pipeline)
+            )
+
+            print(payload)
+
+            self.assertTrue(Success)
+            self.assertFalse(alert)
+
+            self.assertTrue(uuid.UUID(payload["uuid"], version=4))
+            self.assertEqual(
+                payload["artifact"],
+                "mscape|sample-test|run-test",
+            )
+            self.assertEqual(payload["scylla_version"], "test_version")
+            self.assertEqual(payload["project"], "mscape")
+            self.assertEqual(payload["site"], "birm")
+            self.assertEqual(payload["platform"], "ont")
+            self.assertEqual(payload["climb_id"], "test_climb_id")
+            self.assertEqual(payload["created"], True)
+            self.assertEqual(payload["published"], True)
+            self.assertEqual(payload["onyx_create_status"], True)
+            self.assertEqual(payload["test_flag"], False)
+
+            published_reads_contents = self.s3_client.list_objects(
+                Bucket="mscape-published-reads"
+            )
+            self.assertEqual(
+                published_reads_contents["Contents"][0]["Key"], "test_climb_id.fastq.gz"
+            )
+
+            published_reports_contents = self.s3_client.list_objects(
+                Bucket="mscape-published-reports"
+            )
+            self.assertEqual(
+                published_reports_contents["Contents"][0]["Key"],
+                "test_climb_id_scylla_report.html",
+            )
+
+            published_taxon_reports_contents = self.s3_client.list_objects(
+                Bucket="mscape-published-taxon-reports"
+            )
+            self.assertIn(
+                "test_climb_id/test_climb_id_PlusPF.kraken_report.txt",
+                [x["Key"] for x in published_taxon_reports_contents["Contents"]],
+            )
+
+            published_binned_reads_contents = self.s3_client.list_objects(
+                Bucket="mscape-published-binned-reads"
+            )
+            self.assertEqual(
+                published_binned_reads_contents["Contents"][0]["Key"],
+                "test_climb_id/test_climb_id_286.fastq.gz",
+            )
+
+    def test_validator_successful_tar_read_fractions(self):
+        with (
+            patch("roz_scripts.utils.utils.pipeline") as mock_pipeline,
+            patch("roz_scripts.utils.utils.OnyxClient") as mock_client,
+        ):
+            mock_pipeline.return_value.execute.return_value = 0
+
+            mock_pipeline.return_value.cmd.return_value = "Hello pytest :)"
+
+            mock_client.return_value.__enter__.return_value.update.return_value = {}
+
+            mock_client.return_value.__enter__.return_value.csv_create.return_value = {
+                "climb_id": "test_climb_id",
+                "run_index": "sample-test",
+                "run_id": "run-test",
+                "biosample_id": "test_biosample_id",
+                "biosample_source_id": "test_biosample_source_id",
+            }
+
+            mock_client.return_value.__enter__.return_value.identify = Mock(
+                side_effect=OnyxRequestError(
+                    message="test identify exception",
+                    response=MockResponse(
+                        status_code=404,
+                        json_data={
+                            "data": [],
+                            "messages": {"run_index": "Test run_index error handling"},
+                        },
+                    ),
+                )
+            )
+
+            mock_client.return_value.__enter__.return_value.filter.return_value = iter(
+                ()
+            )
+
+            result_path = os.path.join(DIR, example_validator_message["uuid"])
+            preprocess_path = os.path.join(result_path, "preprocess")
+            classifications_path = os.path.join(result_path, "classifications")
+            pipeline_info_path = os.path.join(result_path, "pipeline_info")
+            binned_reads_path = os.path.join(result_path, "reads_by_taxa")
+            read_fraction_path = os.path.join(result_path, "read_fractions")
+            qc_path = os.path.join(result_path, "qc")
+
+            os.makedirs(preprocess_path, exist_ok=True)
+            os.makedirs(classifications_path, exist_ok=True)
+            os.makedirs(pipeline_info_path, exist_ok=True)
+            os.makedirs(binned_reads_path, exist_ok=True)
+            os.makedirs(read_fraction_path, exist_ok=True)
+            os.makedirs(qc_path, exist_ok=True)
+
+            open(
+                os.path.join(
+                    preprocess_path,
+                    f"{example_validator_message['uuid']}.fastp.fastq.gz",
+                ),
+                "w",
+            ).close()
+            open(
+                os.path.join(read_fraction_path, "human_filtered.fastq.gz"), "w"
+            ).close()
+            open(os.path.join(read_fraction_path, "viral.fastq.gz"), "w").close()
+            open(os.path.join(read_fraction_path, "unclassified.fastq.gz"), "w").close()
+            open(
+                os.path.join(read_fraction_path, "viral_and_unclassified.fastq.gz"), "w"
+            ).close()
+            open(
+                os.path.join(classifications_path, "PlusPF.kraken_report.txt"), "w"
+            ).close()
+            open(os.path.join(binned_reads_path, "286.fastq.gz"), "w").close()
+            open(
+                os.path.join(
+                    result_path, f"{example_validator_message['uuid']}_report.html"
+                ),
+                "w",
+            ).close()
+
+            with open(
+                os.path.join(
+                    pipeline_info_path,
+                    f"execution_trace_{example_validator_message['uuid']}.txt",
+                ),
+                "w",
+            ) as f:
+                f.write(example_execution_trace)
+
+            with open(
+                os.path.join(
+                    pipeline_info_path,
+                    f"workflow_version_{example_validator_message['uuid']}.txt",
+                ),
+                "w",
+            ) as f:
+                f.write("test_version")
+
+            with open(
+                os.path.join(
+                    pipeline_info_path,
+                    f"params_{example_validator_message['uuid']}.log",
+                ),
+                "w",
+            ) as f:
+                f.write(json.dumps(example_params))
+
+            with open(
+                os.path.join(classifications_path, "PlusPF.kraken_report.json"), "w"
+            ) as f:
+                f.write(json.dumps(example_k2_out))
+
+            with open(
+                os.path.join(binned_reads_path, "reads_summary_combined.json"), "w"
+            ) as f:
+                json.dump(example_reads_summary, f)
+
+            spike_count_summary = {
+                "zymo-mc_D6320": {
+                    "Allobacillus_halotolerans": {
+                        "taxid": "570278",
+                        "human_readable": "Allobacillus halotolerans",
+                        "mapped_count": 0,
+                        "mapped_percentage": 0.0,
+                    },
+                    "Imtechella_halotolerans": {
+                        "taxid": "1165090",
+                        "human_readable": "Imtechella halotolerans",
+                        "mapped_count": 0,
+                        "mapped_percentage": 0.0,
+                    },
+                }
+            }
+
+            spike_summary = {
+                "zymo-mc_D6320": "pass",
+            }
+
+            with open(os.path.join(qc_path, "spike_count_summary.json"), "w") as f:
+                json.dump(spike_count_summary, f)
+
+            with open(os.path.join(qc_path, "spike_summary.json"), "w") as f:
+                json.dump(spike_summary, f)
+
+            args = SimpleNamespace(
+                logfile=MSCAPE_VALIDATION_LOG_FILENAME,
+                log_level="DEBUG",
+                nxf_executable="test",
+                config="test",
+                k2_host="test",
+                result_dir=DIR,
+                n_workers=2,
+                retry_delay=2,
+                project="mscape",
+                tar_read_fractions=True,
             )
 
             pipeline = utils.pipeline(
@@ -1202,6 +1430,41 @@ class Test_mscape_validator(unittest.TestCase):
                 "test_climb_id/test_climb_id_286.fastq.gz",
             )
 
+            read_fractions_key = "test_climb_id/test_climb_id.read_fractions.tar"
+
+            mock_client.return_value.__enter__.return_value.update.assert_any_call(
+                project="mscape",
+                climb_id="test_climb_id",
+                fields={
+                    "read_fractions_tar": f"s3://mscape-published-read-fractions/{read_fractions_key}"
+                },
+            )
+
+            published_read_fractions_contents = self.s3_client.list_objects(
+                Bucket="mscape-published-read-fractions"
+            )
+            self.assertEqual(
+                [x["Key"] for x in published_read_fractions_contents["Contents"]],
+                [read_fractions_key],
+            )
+
+            read_fractions_tar = self.s3_client.get_object(
+                Bucket="mscape-published-read-fractions", Key=read_fractions_key
+            )
+
+            with tarfile.open(
+                fileobj=io.BytesIO(read_fractions_tar["Body"].read()), mode="r:"
+            ) as tar_fh:
+                self.assertEqual(
+                    sorted(tar_fh.getnames()),
+                    [
+                        "human_filtered.fastq.gz",
+                        "unclassified.fastq.gz",
+                        "viral.fastq.gz",
+                        "viral_and_unclassified.fastq.gz",
+                    ],
+                )
+
     def test_too_much_human(self):
         with (
             patch("roz_scripts.utils.utils.pipeline") as mock_pipeline,
@@ -1332,6 +1595,7 @@ class Test_mscape_validator(unittest.TestCase):
                 n_workers=2,
                 retry_delay=2,
                 project="mscape",
+                tar_read_fractions=False,
             )
 
             pipeline = utils.pipeline(
@@ -1500,6 +1764,7 @@ class Test_mscape_validator(unittest.TestCase):
                 n_workers=2,
                 retry_delay=2,
                 project="mscape",
+                tar_read_fractions=False,
             )
 
             pipeline = utils.pipeline(
@@ -1769,6 +2034,7 @@ class Test_mscape_validator(unittest.TestCase):
                 n_workers=2,
                 retry_delay=2,
                 project="mscape",
+                tar_read_fractions=False,
             )
 
             pipeline = utils.pipeline(
@@ -2065,6 +2331,7 @@ class Test_mscape_validator(unittest.TestCase):
                 n_workers=2,
                 retry_delay=2,
                 project="mscape",
+                tar_read_fractions=False,
             )
 
             pipeline = utils.pipeline(
@@ -2302,6 +2569,7 @@ class Test_mscape_validator(unittest.TestCase):
                 n_workers=2,
                 retry_delay=2,
                 project="mscape",
+                tar_read_fractions=False,
             )
 
             pipeline = utils.pipeline(
@@ -2351,6 +2619,10 @@ class Test_mscape_validator(unittest.TestCase):
 
 class Test_pathsafe_validator(unittest.TestCase):
     def setUp(self):
+        # The Onyx and Pathogenwatch clients are patched per test, so drop anything cached by an earlier one
+        utils.reset_onyx_client()
+        pathsafe_validation.reset_pathogenwatch_session()
+
         self.server = ThreadedMotoServer()
         self.server.start()
 
@@ -2455,17 +2727,18 @@ class Test_pathsafe_validator(unittest.TestCase):
     def test_successful_test(self):
         with (
             patch("roz_scripts.pathsafe_validation.pipeline") as mock_pipeline,
-            patch("roz_scripts.pathsafe_validation.OnyxClient") as mock_local_client,
             patch("roz_scripts.utils.utils.OnyxClient") as mock_util_client,
-            patch("roz_scripts.pathsafe_validation.requests") as mock_requests,
+            patch(
+                "roz_scripts.pathsafe_validation.get_pathogenwatch_session"
+            ) as mock_pathogenwatch_session,
         ):
             mock_pipeline.return_value.execute.return_value = 0
 
-            mock_requests.post.return_value = MockResponse(
+            mock_pathogenwatch_session.return_value.post.return_value = MockResponse(
                 status_code=201, json_data={"id": "test_pwid", "uuid": "test_uuid"}
             )
 
-            mock_requests.get.return_value = MockResponse(
+            mock_pathogenwatch_session.return_value.get.return_value = MockResponse(
                 status_code=200,
                 json_data=[
                     {
@@ -2515,7 +2788,7 @@ class Test_pathsafe_validator(unittest.TestCase):
 
             mock_util_client.return_value.__enter__.return_value.csv_create = Mock()
 
-            mock_local_client.return_value.__enter__.return_value.get.return_value = {
+            mock_util_client.return_value.__enter__.return_value.get.return_value = {
                 "hello": "goodbye"
             }
 
@@ -2595,19 +2868,20 @@ class Test_pathsafe_validator(unittest.TestCase):
     def test_onyx_fail(self):
         with (
             patch("roz_scripts.pathsafe_validation.pipeline") as mock_pipeline,
-            patch("roz_scripts.pathsafe_validation.OnyxClient") as mock_local_client,
             patch("roz_scripts.utils.utils.OnyxClient") as mock_util_client,
-            patch("roz_scripts.pathsafe_validation.requests") as mock_requests,
+            patch(
+                "roz_scripts.pathsafe_validation.get_pathogenwatch_session"
+            ) as mock_pathogenwatch_session,
         ):
             mock_pipeline.return_value.execute.return_value = 0
 
-            mock_requests.post = Mock(
+            mock_pathogenwatch_session.return_value.post = Mock(
                 side_effect=MockResponse(
                     status_code=201, json_data={"id": "test_pwid", "uuid": "test_uuid"}
                 )
             )
 
-            mock_requests.get = Mock(
+            mock_pathogenwatch_session.return_value.get = Mock(
                 side_effect=MockResponse(
                     status_code=200,
                     json_data=[
@@ -2666,7 +2940,7 @@ class Test_pathsafe_validator(unittest.TestCase):
                 )
             )
 
-            mock_local_client.return_value.__enter__.return_value.get.return_value = {
+            mock_util_client.return_value.__enter__.return_value.get.return_value = {
                 "hello": "goodbye"
             }
 
@@ -2861,17 +3135,18 @@ class Test_pathsafe_validator(unittest.TestCase):
     def test_validator_successful(self):
         with (
             patch("roz_scripts.pathsafe_validation.pipeline") as mock_pipeline,
-            patch("roz_scripts.pathsafe_validation.OnyxClient") as mock_local_client,
             patch("roz_scripts.utils.utils.OnyxClient") as mock_util_client,
-            patch("roz_scripts.pathsafe_validation.requests") as mock_requests,
+            patch(
+                "roz_scripts.pathsafe_validation.get_pathogenwatch_session"
+            ) as mock_pathogenwatch_session,
         ):
             mock_pipeline.return_value.execute.return_value = 0
 
-            mock_requests.post.return_value = MockResponse(
+            mock_pathogenwatch_session.return_value.post.return_value = MockResponse(
                 status_code=201, json_data={"id": "test_pwid", "uuid": "test_uuid"}
             )
 
-            mock_requests.get.return_value = MockResponse(
+            mock_pathogenwatch_session.return_value.get.return_value = MockResponse(
                 status_code=200,
                 json_data=[
                     {
@@ -2929,7 +3204,7 @@ class Test_pathsafe_validator(unittest.TestCase):
                 "biosample_source_id": "",
             }
 
-            mock_local_client.return_value.__enter__.return_value.get.return_value = {
+            mock_util_client.return_value.__enter__.return_value.get.return_value = {
                 "site": "birm",
                 "platform": "illumina",
             }
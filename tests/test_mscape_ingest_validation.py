@@ -0,0 +1,256 @@
+import unittest
+from unittest.mock import patch, Mock
+from types import SimpleNamespace
+from pathlib import Path
+import io
+import logging
+import os
+import tarfile
+import tempfile
+
+from botocore.exceptions import ClientError
+
+from roz_scripts.mscape import mscape_ingest_validation
+
+example_payload = {
+    "uuid": "42c3796d-d767-4293-97a8-c4906bb5cca8",
+    "site": "birm",
+    "project": "mscape",
+    "platform": "ont",
+    "climb_id": "C-TEST",
+    "scylla_version": "1.0.0",
+    "test_flag": False,
+    "rerun": False,
+    "ingest_errors": [],
+    "files": {
+        ".fastq.gz": {
+            "uri": "s3://mscape-birm-ont-prod/mscape.sample-test.run-test.fastq.gz",
+            "etag": "179d94f8cd22896c2a80a9a7c98463d2-21",
+            "key": "mscape.sample-test.run-test.fastq.gz",
+        },
+        ".csv": {
+            "uri": "s3://mscape-birm-ont-prod/mscape.sample-test.run-test.csv",
+            "etag": "77032b33ef9fee11ebe5027f9a7b0c21",
+            "key": "mscape.sample-test.run-test.csv",
+        },
+    },
+}
+
+
+class test_publish_validated_artifact(unittest.TestCase):
+    def setUp(self):
+        os.environ["SCYLLA_K2_DB_PATH"] = "/shared/k2/PlusPF/"
+        os.environ["SCYLLA_K2_DB_DATE"] = "2024-01-01"
+        os.environ["SCYLLA_TAXONOMY_PATH"] = "/shared/taxonomy/"
+        os.environ["SCYLLA_TAXONOMY_DATE"] = "2024-01-01"
+        mscape_ingest_validation.get_pipeline_env.cache_clear()
+
+        self.log = logging.getLogger("test")
+        self.args = SimpleNamespace(
+            project="mscape", n_workers=1, tar_read_fractions=False
+        )
+        self.payload = {
+            k: v.copy() if isinstance(v, (dict, list)) else v
+            for k, v in example_payload.items()
+        }
+
+    def tearDown(self):
+        mscape_ingest_validation.get_pipeline_env.cache_clear()
+
+    def test_metadata_update_failure_reruns(self):
+        for alert in (True, False):
+            payload = dict(self.payload, rerun=False)
+
+            with patch.object(mscape_ingest_validation, "get_s3_client"), patch.object(
+                mscape_ingest_validation,
+                "onyx_update",
+                return_value=(True, alert, payload),
+            ) as mock_update, patch.object(
+                mscape_ingest_validation, "add_reads_record"
+            ) as mock_reads:
+                success, _, _, payload, _ = (
+                    mscape_ingest_validation.publish_validated_artifact(
+                        message=Mock(),
+                        args=self.args,
+                        log=self.log,
+                        payload=payload,
+                        artifact_metadata={},
+                        result_path=Path("/tmp/does-not-exist"),
+                    )
+                )
+
+            self.assertFalse(success)
+            self.assertTrue(payload["rerun"])
+            mock_update.assert_called_once()
+            self.assertIn("classifier", mock_update.call_args.kwargs["fields"])
+            mock_reads.assert_not_called()
+
+
+class test_dynamic_timeout(unittest.TestCase):
+    def test_head_failure_falls_back(self):
+        s3_client = Mock()
+        s3_client.head_object.side_effect = ClientError(
+            {"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject"
+        )
+
+        with patch.object(
+            mscape_ingest_validation, "get_s3_client", return_value=s3_client
+        ), self.assertLogs("test", level="ERROR"):
+            timeout, content_lengths = mscape_ingest_validation.dynamic_timeout(
+                "s3://mscape-birm-ont-prod/mscape.sample-test.run-test.fastq.gz",
+                log=logging.getLogger("test"),
+            )
+
+        self.assertEqual(timeout, 1800)
+        self.assertEqual(content_lengths, {})
+
+    def test_timeout_from_content_length(self):
+        s3_client = Mock()
+        s3_client.head_object.return_value = {"ContentLength": 2 * 1000000}
+
+        with patch.object(
+            mscape_ingest_validation, "get_s3_client", return_value=s3_client
+        ):
+            timeout, content_lengths = mscape_ingest_validation.dynamic_timeout(
+                "s3://bucket/one.fastq.gz",
+                "s3://bucket/two.fastq.gz",
+                log=logging.getLogger("test"),
+            )
+
+        self.assertEqual(
+            content_lengths,
+            {"s3://bucket/one.fastq.gz": 2000000, "s3://bucket/two.fastq.gz": 2000000},
+        )
+        self.assertEqual(timeout, mscape_ingest_validation._TIMEOUT_TABLE[3])
+
+
+class test_batched_onyx_update(unittest.TestCase):
+    def test_batches_sent_in_order_with_alert(self):
+        records = [{"taxon_id": i} for i in range(250)]
+        results = [(False, False, {}), (True, True, {}), (False, False, {})]
+
+        with patch.object(
+            mscape_ingest_validation, "onyx_update", side_effect=results
+        ) as mock_update:
+            update_fail, alert, _ = mscape_ingest_validation.batched_onyx_update(
+                payload={}, field="taxa_files", records=records, log=Mock()
+            )
+
+        self.assertTrue(update_fail)
+        self.assertTrue(alert)
+        self.assertEqual(
+            [
+                len(call.kwargs["fields"]["taxa_files"])
+                for call in mock_update.mock_calls
+            ],
+            [100, 100, 50],
+        )
+        self.assertEqual(
+            mock_update.mock_calls[0].kwargs["fields"]["taxa_files"][0],
+            {"taxon_id": 0},
+        )
+
+
+class test_read_fractions_tar_upload(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fractions = {
+            "C-TEST_viral.fastq.gz": os.urandom(256 * 1024),
+            "C-TEST_bacterial.fastq.gz": b"@read\nACGT\n+\n!!!!\n",
+        }
+
+        os.mkdir(os.path.join(self.tmp_dir.name, "read_fractions"))
+
+        for name, contents in self.fractions.items():
+            with open(
+                os.path.join(self.tmp_dir.name, "read_fractions", name), "wb"
+            ) as fh:
+                fh.write(contents)
+
+        self.payload = dict(example_payload, ingest_errors=[])
+        self.s3_client = Mock()
+        self.uploaded = {}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fake_upload_stream(self, s3_client, fileobj, bucket, key, transfer_config):
+        self.uploaded[(bucket, key)] = fileobj.read()
+
+    def test_tar_round_trip(self):
+        with patch.object(
+            mscape_ingest_validation,
+            "upload_stream",
+            side_effect=self.fake_upload_stream,
+        ), patch.object(
+            mscape_ingest_validation,
+            "onyx_update",
+            side_effect=lambda payload, fields, log: (False, False, payload),
+        ) as mock_update:
+            fail, alert, payload = mscape_ingest_validation.read_fractions_tar_upload(
+                payload=self.payload,
+                s3_client=self.s3_client,
+                result_path=self.tmp_dir.name,
+                log=logging.getLogger("test"),
+            )
+
+        self.assertFalse(fail)
+        self.assertFalse(alert)
+
+        bucket, key = (
+            "mscape-published-read-fractions",
+            "C-TEST/C-TEST.read_fractions.tar",
+        )
+
+        with tarfile.open(
+            fileobj=io.BytesIO(self.uploaded[(bucket, key)]), mode="r:"
+        ) as tar_fh:
+            self.assertEqual(
+                {
+                    member.name: tar_fh.extractfile(member).read()
+                    for member in tar_fh.getmembers()
+                },
+                self.fractions,
+            )
+
+        mock_update.assert_called_once()
+        self.assertEqual(
+            mock_update.call_args.kwargs["fields"],
+            {"read_fractions_tar": f"s3://{bucket}/{key}"},
+        )
+        self.s3_client.delete_object.assert_not_called()
+
+    def test_writer_failure_deletes_object(self):
+        def failing_writer(write_fd, paths):
+            with os.fdopen(write_fd, "wb") as write_fh:
+                write_fh.write(b"partial")
+
+            raise OSError("fraction vanished")
+
+        with patch.object(
+            mscape_ingest_validation,
+            "upload_stream",
+            side_effect=self.fake_upload_stream,
+        ), patch.object(
+            mscape_ingest_validation, "_write_tar_stream", failing_writer
+        ), patch.object(
+            mscape_ingest_validation, "onyx_update"
+        ) as mock_update:
+            fail, alert, payload = mscape_ingest_validation.read_fractions_tar_upload(
+                payload=self.payload,
+                s3_client=self.s3_client,
+                result_path=self.tmp_dir.name,
+                log=logging.getLogger("test"),
+            )
+
+        self.assertTrue(fail)
+        self.assertTrue(alert)
+        self.assertIn(
+            "Failed to upload read fraction tar to storage bucket",
+            payload["ingest_errors"],
+        )
+        self.s3_client.delete_object.assert_called_once_with(
+            Bucket="mscape-published-read-fractions",
+            Key="C-TEST/C-TEST.read_fractions.tar",
+        )
+        mock_update.assert_not_called()
@@ -15,6 +15,12 @@ from roz_scripts.utils.utils import (
     onyx_reconcile,
     get_s3_credentials,
     valid_character_checks,
+    reset_onyx_client,
+    upload_files,
+    upload_local_file,
+    s3_to_fh,
+    EtagMismatchError,
+    UPLOAD_SLOTS,
 )
 
 import moto
@@ -23,7 +29,9 @@ import unittest
 from unittest.mock import patch, Mock
 import os
 import copy
-
+import tempfile
+import threading
+import time
 
 DIR = os.path.dirname(__file__)
 
@@ -42,6 +50,9 @@ class MockResponse:
 
 class test_utils(unittest.TestCase):
     def setUp(self):
+        # OnyxClient is patched per test, so drop any client cached by an earlier one
+        reset_onyx_client()
+
         os.environ["AWS_ACCESS_KEY_ID"] = "testing"
         os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
         os.environ["AWS_SECURITY_TOKEN"] = "testing"
@@ -142,6 +153,8 @@ class test_utils(unittest.TestCase):
             self.assertFalse(alert)
             self.assertNotIn("climb_id", payload.keys())
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client:
             mock_client.return_value.__enter__.return_value.csv_create.return_value = {
                 "climb_id": "test_climb_id",
@@ -162,6 +175,8 @@ class test_utils(unittest.TestCase):
             self.assertFalse(alert)
             self.assertEqual("test_climb_id", payload["climb_id"])
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client, patch(
             "roz_scripts.utils.utils.check_artifact_published"
         ) as mock_published_check:
@@ -190,6 +205,8 @@ class test_utils(unittest.TestCase):
             self.assertFalse(success)
             self.assertFalse(alert)
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client, patch(
             "roz_scripts.utils.utils.check_artifact_published"
         ) as mock_published_check:
@@ -219,6 +236,8 @@ class test_utils(unittest.TestCase):
             self.assertTrue(success)
             self.assertFalse(alert)
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client:
             mock_client.return_value.__enter__.return_value.csv_create = Mock(
                 side_effect=OnyxClientError(
@@ -240,6 +259,8 @@ class test_utils(unittest.TestCase):
                 payload["onyx_test_create_errors"]["onyx_errors"],
             )
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client:
             mock_client.return_value.__enter__.return_value.csv_create = Mock(
                 side_effect=OnyxRequestError(
@@ -269,6 +290,8 @@ class test_utils(unittest.TestCase):
                 payload["onyx_test_create_errors"]["run_index"],
             )
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client:
             mock_client.return_value.__enter__.return_value.csv_create = Mock(
                 side_effect=OnyxConnectionError()
@@ -289,6 +312,8 @@ class test_utils(unittest.TestCase):
 
             self.assertEqual(len(csv_create_calls), 4)
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client:
             mock_client.return_value.__enter__.return_value.csv_create = Mock(
                 side_effect=OnyxServerError(
@@ -307,6 +332,8 @@ class test_utils(unittest.TestCase):
             self.assertFalse(success)
             self.assertTrue(alert)
 
+        reset_onyx_client()
+
         with patch("roz_scripts.utils.utils.OnyxClient") as mock_client:
             mock_client.return_value.__enter__.return_value.csv_create = Mock(
                 side_effect=OnyxConfigError()
@@ -597,3 +624,94 @@ class test_utils(unittest.TestCase):
             "run_id contains invalid characters, must be alphanumeric and contain only hyphens and underscores",
             payload["onyx_test_create_errors"]["run_id"],
         )
+
+    def test_s3_to_fh_etag_mismatch_closes_body(self):
+        body = Mock()
+        s3_client = Mock()
+        s3_client.get_object.return_value = {"ETag": '"not-the-etag"', "Body": body}
+
+        with patch("roz_scripts.utils.utils.get_s3_client", return_value=s3_client):
+            with self.assertRaises(EtagMismatchError):
+                s3_to_fh(
+                    self.example_match["files"][".csv"]["uri"],
+                    self.example_match["files"][".csv"]["etag"],
+                )
+
+        body.close.assert_called_once_with()
+
+
+class test_upload_files(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+        self.s3_client = Mock()
+        self.s3_client.upload_fileobj.side_effect = self.fake_upload
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fake_upload(self, fileobj, bucket, key, Config=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+        time.sleep(0.05)
+
+        with self.lock:
+            self.active -= 1
+
+        if key == "missing":
+            raise FileNotFoundError(key)
+
+    def make_uploads(self, n):
+        uploads = []
+
+        for i in range(n):
+            path = os.path.join(self.tmp_dir.name, f"{i}.fastq.gz")
+
+            with open(path, "wb") as fh:
+                fh.write(b"test")
+
+            uploads.append((path, "bucket", f"key-{i}"))
+
+        return uploads
+
+    def test_upload_files_results_in_order(self):
+        uploads = self.make_uploads(3)
+        uploads[1] = (uploads[1][0], "bucket", "missing")
+
+        upload_exceptions = upload_files(s3_client=self.s3_client, uploads=uploads)
+
+        self.assertIsNone(upload_exceptions[0])
+        self.assertIsInstance(upload_exceptions[1], FileNotFoundError)
+        self.assertIsNone(upload_exceptions[2])
+        self.assertEqual(upload_files(s3_client=self.s3_client, uploads=[]), [])
+
+    def test_concurrent_callers_share_upload_slots(self):
+        uploads = self.make_uploads(4 * UPLOAD_SLOTS)
+
+        callers = [
+            threading.Thread(
+                target=upload_files,
+                kwargs={"s3_client": self.s3_client, "uploads": uploads[i::4]},
+            )
+            for i in range(4)
+        ] + [
+            threading.Thread(
+                target=upload_local_file,
+                args=(self.s3_client, uploads[i][0], "bucket", f"direct-{i}"),
+            )
+            for i in range(UPLOAD_SLOTS)
+        ]
+
+        for caller in callers:
+            caller.start()
+
+        for caller in callers:
+            caller.join()
+
+        self.assertEqual(self.s3_client.upload_fileobj.call_count, 5 * UPLOAD_SLOTS)
+        self.assertLessEqual(self.peak, UPLOAD_SLOTS)
@@ -1,12 +1,204 @@
 import unittest
+from unittest.mock import patch, Mock
+from types import SimpleNamespace
+import json
+import os
+import tempfile
+import threading
+import time
+
+from roz_scripts.mscape import mscape_ingest_validation
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+
+        time.sleep(0.05)
+
+    return False
+
+
+def make_message(uuid, action):
+    return SimpleNamespace(body=json.dumps({"uuid": uuid, "action": action}))
+
+
+# Jobs with the "block" action wait for this file to exist so a test can hold them mid-job, a file rather than
+# an mp.Event as terminating a worker that is waiting on an Event leaves it unusable
+RELEASE_PATH = os.path.join(
+    tempfile.gettempdir(), f"test_worker_pool.{os.getpid()}.release"
+)
+
+
+def release_jobs():
+    with open(RELEASE_PATH, "w"):
+        pass
+
+
+def dummy_create_validated_artifact(message, args, ingest_pipe, log):
+    to_validate = json.loads(message.body)
+
+    if to_validate["action"] == "block":
+        wait_for(lambda: os.path.exists(RELEASE_PATH), timeout=60)
+
+    payload = {
+        "uuid": to_validate["uuid"],
+        "project": "mscape",
+        "site": "birm",
+        "test_flag": True,
+        "rerun": to_validate["action"] == "rerun",
+        "ingest_errors": [],
+        "cpus": sorted(os.sched_getaffinity(0)),
+    }
+
+    if to_validate["action"] == "raise":
+        raise ValueError(f"validation failed for {payload['uuid']}")
+
+    if to_validate["action"] == "publish_raise":
+        return ((False, False, [], payload, message), {"payload": payload})
+
+    return ((to_validate["action"] == "ok", False, [], payload, message), None)
+
+
+def dummy_publish_validated_artifact(payload):
+    raise RuntimeError(f"publish failed for {payload['uuid']}")
 
 
 class test_worker_pool(unittest.TestCase):
     def setUp(self) -> None:
-        pass
+        # The workers are forked from this process, so anything patched here is what they run
+        for patcher in (
+            patch.object(
+                mscape_ingest_validation,
+                "create_validated_artifact",
+                dummy_create_validated_artifact,
+            ),
+            patch.object(
+                mscape_ingest_validation,
+                "publish_validated_artifact",
+                dummy_publish_validated_artifact,
+            ),
+            patch.object(mscape_ingest_validation, "get_s3_client"),
+            patch.object(mscape_ingest_validation, "put_result_json"),
+            patch.object(
+                mscape_ingest_validation.worker_pool_handler, "error_callback"
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.varys_client = Mock()
+        self.worker_pool = self.make_worker_pool()
+
+    def make_worker_pool(self, **kwargs):
+        return mscape_ingest_validation.worker_pool_handler(
+            workers=1,
+            logger=Mock(),
+            varys_client=self.varys_client,
+            project="mscape",
+            args=SimpleNamespace(project="mscape"),
+            ingest_pipe=None,
+            retry_delay=0.5,
+            **kwargs,
+        )
 
     def tearDown(self) -> None:
-        pass
+        self.worker_pool.close(timeout=5)
 
-    def test_worker_pool(self):
-        pass
+        if os.path.exists(RELEASE_PATH):
+            os.remove(RELEASE_PATH)
+
+    def test_publish_exception_reaches_error_callback(self):
+        self.worker_pool.submit_job(make_message("publish-uuid", "publish_raise"))
+
+        self.assertTrue(wait_for(lambda: self.worker_pool.error_callback.called))
+        self.worker_pool.error_callback.assert_called_once_with(
+            "publish failed for publish-uuid"
+        )
+        self.varys_client.acknowledge_message.assert_not_called()
+
+    def test_result_is_acked(self):
+        message = make_message("ok-uuid", "ok")
+
+        self.worker_pool.submit_job(message)
+
+        self.assertTrue(wait_for(lambda: self.varys_client.acknowledge_message.called))
+        self.varys_client.acknowledge_message.assert_called_once_with(message)
+        self.varys_client.nack_message.assert_not_called()
+        self.worker_pool.error_callback.assert_not_called()
+
+    def test_rerun_is_nacked_after_delay(self):
+        message = make_message("rerun-uuid", "rerun")
+
+        submitted = time.monotonic()
+        self.worker_pool.submit_job(message)
+
+        self.assertTrue(wait_for(lambda: self.varys_client.nack_message.called))
+        self.assertGreaterEqual(time.monotonic() - submitted, 0.5)
+        self.varys_client.nack_message.assert_called_once_with(message)
+        self.varys_client.acknowledge_message.assert_not_called()
+
+    def test_worker_exception_reaches_error_callback(self):
+        self.worker_pool.submit_job(make_message("raise-uuid", "raise"))
+
+        self.assertTrue(wait_for(lambda: self.worker_pool.error_callback.called))
+        self.worker_pool.error_callback.assert_called_once_with(
+            "validation failed for raise-uuid"
+        )
+
+    def test_close_terminates_stuck_workers(self):
+        self.worker_pool.submit_job(make_message("block-uuid", "block"))
+
+        # Give the worker time to pick the job up before asking it to stop
+        time.sleep(0.5)
+
+        started = time.monotonic()
+        self.worker_pool.close(timeout=0.5)
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertFalse(any(worker.is_alive() for worker in self.worker_pool._workers))
+        self.varys_client.acknowledge_message.assert_not_called()
+
+    def test_inflight_bound_blocks_submit(self):
+        # One worker holds one pipeline run plus one job per I/O slot
+        bound = 1 + mscape_ingest_validation._IO_THREADS_PER_WORKER
+
+        for i in range(bound):
+            self.worker_pool.submit_job(make_message(f"block-uuid-{i}", "block"))
+
+        submitter = threading.Thread(
+            target=self.worker_pool.submit_job,
+            args=(make_message("ok-uuid", "ok"),),
+            daemon=True,
+        )
+        submitter.start()
+        submitter.join(0.5)
+
+        self.assertTrue(submitter.is_alive())
+
+        release_jobs()
+        submitter.join(10)
+
+        self.assertFalse(submitter.is_alive())
+        self.assertTrue(
+            wait_for(
+                lambda: self.varys_client.acknowledge_message.call_count == bound + 1
+            )
+        )
+        self.varys_client.nack_message.assert_not_called()
+
+    def test_worker_applies_its_cpus(self):
+        worker_cpus = sorted(os.sched_getaffinity(0))[-1:]
+
+        self.worker_pool.close(timeout=5)
+        self.worker_pool = self.make_worker_pool(worker_cpus=worker_cpus)
+
+        self.worker_pool.submit_job(make_message("ok-uuid", "ok"))
+
+        self.assertTrue(wait_for(lambda: self.varys_client.send.called))
+        self.assertEqual(
+            self.varys_client.send.call_args.kwargs["message"]["cpus"], worker_cpus
+        )